@@ -0,0 +1,126 @@
+import random
+from functools import lru_cache
+
+from engine import CLASSIC, iter_bits, other_player
+import book
+import mcts
+import metrics
+import search
+import solver
+from symmetry import CELL_ORBITS
+
+SEARCH_TIME_BUDGET = 1.0  # seconds per Hard move on boards larger than 3x3
+
+
+@lru_cache(maxsize=None)
+def preference_masks(geometry):
+    """Cell masks in the order the smart move prefers them.
+
+    On 3x3 that is center, corners, then edges (the board's symmetry
+    classes); larger boards use rings of cells outward from the center.
+    """
+    if geometry is CLASSIC:
+        orbits = CELL_ORBITS
+    else:
+        size = geometry.size
+        rings = {}
+        for i in range(geometry.cells):
+            row, col = divmod(i, size)
+            ring = max(abs(2 * row - (size - 1)), abs(2 * col - (size - 1)))
+            rings.setdefault(ring, []).append(i)
+        orbits = [rings[ring] for ring in sorted(rings)]
+    return tuple(sum(geometry.cell_bits[cell] for cell in orbit) for orbit in orbits)
+
+
+def get_easy_move(state, rng=random):
+    # Just make a random move
+    empty_cells = state.legal_moves()
+    if empty_cells:
+        return rng.choice(empty_cells)
+    return None
+
+
+@metrics.timed("ai.get_smart_move")
+def get_smart_move(state, rng=random):
+    geometry = state.geometry
+    player = state.current_player
+    opponent = other_player(player)
+    free = state.free
+
+    # Try to win, then block the opponent's win
+    for target in (player, opponent):
+        bits = state.bits[target]
+        for i in iter_bits(free):
+            if geometry.wins_through(bits | geometry.cell_bits[i], i):
+                return divmod(i, geometry.size)
+
+    # Otherwise prefer central cells: center, corners, then edges on 3x3
+    for mask in preference_masks(geometry):
+        cells = list(iter_bits(free & mask))
+        if cells:
+            return divmod(rng.choice(cells), geometry.size)
+
+    return None
+
+
+def get_medium_move(state, rng=random):
+    if rng.random() < 0.7:  # 70% chance of smart move
+        return get_smart_move(state, rng)
+    return get_easy_move(state, rng)
+
+
+def get_perfect_move(state, rng=random, time_budget=SEARCH_TIME_BUDGET, cancel=None):
+    # Perfect play is only solved for the classic board; larger ones get a timed search
+    if not state.is_classic:
+        return search.search_move(state, time_budget, cancel=cancel)
+
+    # Precomputed table first, live search if the book file is unavailable
+    table = book.load_book()
+    if table is not None:
+        move = table.best_move(state, rng)
+        if move is not None:
+            metrics.count("book.hits")
+            return move
+    metrics.count("book.misses")
+    return solver.best_move(state)
+
+
+def get_search_move(state, rng=random, time_budget=SEARCH_TIME_BUDGET, cancel=None):
+    # Timed search on any board size, even where a perfect answer exists
+    return search.search_move(state, time_budget, cancel=cancel)
+
+
+def get_mcts_move(state, rng=random, time_budget=SEARCH_TIME_BUDGET, cancel=None):
+    # Monte Carlo tree search spread over every core; see mcts.last_run for playouts/s
+    return mcts.mcts_move(state, time_budget, rng=rng, cancel=cancel)
+
+
+# Named move pickers, shared by the UI difficulties and the self-play tool
+STRATEGIES = {
+    "easy": get_easy_move,
+    "medium": get_medium_move,
+    "smart": get_smart_move,
+    "hard": get_perfect_move,
+    "search": get_search_move,
+    "mcts": get_mcts_move,
+}
+TIMED_STRATEGIES = {"hard", "search", "mcts"}
+DIFFICULTY_STRATEGIES = {"Easy": "easy", "Medium": "medium", "Hard": "hard", "Expert": "mcts"}
+
+
+@metrics.timed("ai.strategy_move")
+def strategy_move(name, state, rng=random, time_budget=SEARCH_TIME_BUDGET, cancel=None):
+    """Pick a move for state.current_player with the named strategy"""
+    pick = STRATEGIES[name]
+    if name in TIMED_STRATEGIES:
+        return pick(state, rng, time_budget, cancel)
+    return pick(state, rng)
+
+
+def choose_move(state, difficulty, rng=random, time_budget=SEARCH_TIME_BUDGET, cancel=None):
+    """Pick a move for state.current_player at the given difficulty.
+
+    cancel is an optional threading.Event; setting it cuts a search short.
+    """
+    name = DIFFICULTY_STRATEGIES.get(difficulty, "hard")
+    return strategy_move(name, state, rng, time_budget, cancel)
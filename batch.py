@@ -0,0 +1,129 @@
+"""Vectorized evaluation of many boards at once (needs NumPy).
+
+Two input forms are supported:
+
+* packed bitboards: parallel integer arrays of X and O bits, laid out as in
+  engine.Geometry, for boards of up to 64 cells. Boards of up to 16 cells
+  are resolved with a single table gather per array.
+* grids: an int array of shape (B, N, N) holding 0 (empty), 1 (X) or
+  2 (O), for any board size. Wins are found with shifted slices, one
+  pass per direction.
+
+Both return (winners, full, legal): winners is an int8 array with 0 for no
+winner, 1 for X and 2 for O; full is a bool array; legal is the packed mask
+of empty cells (bitboards) or a (B, N, N) bool array (grids).
+"""
+
+from functools import lru_cache
+
+from engine import CLASSIC
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+TABLE_CELLS = 16  # largest board resolved by table lookup
+NO_WINNER, X_WINS, O_WINS = 0, 1, 2
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("batch evaluation needs NumPy: pip install numpy")
+
+
+def _dtype(geometry):
+    if geometry.cells <= 16:
+        return np.uint16
+    if geometry.cells <= 32:
+        return np.uint32
+    if geometry.cells <= 64:
+        return np.uint64
+    raise ValueError(f"{geometry.size}x{geometry.size} boards do not fit a packed bitboard; use grid_status")
+
+
+@lru_cache(maxsize=None)
+def _win_table(geometry):
+    # WIN_TABLE[bits] is True when bits holds a complete line
+    table = np.zeros(1 << geometry.cells, dtype=bool)
+    all_masks = np.arange(1 << geometry.cells, dtype=np.uint32)
+    for mask in geometry.win_masks:
+        table |= (all_masks & mask) == mask
+    return table
+
+
+@lru_cache(maxsize=None)
+def _mask_array(geometry):
+    return np.array(geometry.win_masks, dtype=_dtype(geometry))
+
+
+def _has_line(bits, geometry):
+    if geometry.cells <= TABLE_CELLS:
+        return _win_table(geometry)[bits]
+    masks = _mask_array(geometry)
+    found = np.zeros(bits.shape, dtype=bool)
+    for mask in masks:
+        found |= (bits & mask) == mask
+    return found
+
+
+def batch_status(x_bits, o_bits, geometry=CLASSIC):
+    """Winners, full flags and legal-move masks for packed bitboards"""
+    _require_numpy()
+    dtype = _dtype(geometry)
+    x_bits = np.asarray(x_bits, dtype=dtype)
+    o_bits = np.asarray(o_bits, dtype=dtype)
+    occupied = x_bits | o_bits
+    full_mask = dtype(geometry.full_mask)
+
+    winners = np.zeros(x_bits.shape, dtype=np.int8)
+    winners[_has_line(x_bits, geometry)] = X_WINS
+    winners[_has_line(o_bits, geometry)] = O_WINS
+    full = occupied == full_mask
+    legal = ~occupied & full_mask
+    return winners, full, legal
+
+
+def _runs(plane, win_length):
+    # True where a run of win_length stones starts, for each of the four directions
+    size = plane.shape[-1]
+    found = np.zeros(plane.shape[0], dtype=bool)
+    span = size - win_length + 1
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        rows = size if d_row == 0 else span
+        col_start = win_length - 1 if d_col < 0 else 0
+        cols = size if d_col == 0 else span
+        run = np.ones((plane.shape[0], rows, cols), dtype=bool)
+        for k in range(win_length):
+            r = k * d_row
+            c = col_start + k * d_col
+            run &= plane[:, r:r + rows, c:c + cols]
+        found |= run.any(axis=(1, 2))
+    return found
+
+
+def grid_status(boards, win_length=None):
+    """Winners, full flags and legal-move masks for a (B, N, N) array of 0/1/2 cells"""
+    _require_numpy()
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError("boards must have shape (B, N, N)")
+    win_length = win_length or boards.shape[1]
+
+    winners = np.zeros(boards.shape[0], dtype=np.int8)
+    winners[_runs(boards == X_WINS, win_length)] = X_WINS
+    winners[_runs(boards == O_WINS, win_length)] = O_WINS
+    legal = boards == 0
+    full = ~legal.any(axis=(1, 2))
+    return winners, full, legal
+
+
+def pack_grids(boards, geometry=CLASSIC):
+    """Convert a (B, N, N) array of 0/1/2 cells into packed (x_bits, o_bits) arrays"""
+    _require_numpy()
+    dtype = _dtype(geometry)
+    flat = np.asarray(boards).reshape(len(boards), geometry.cells)
+    weights = (np.ones(geometry.cells, dtype=dtype) << np.arange(geometry.cells, dtype=dtype))
+    x_bits = ((flat == X_WINS) * weights).sum(axis=1, dtype=dtype)
+    o_bits = ((flat == O_WINS) * weights).sum(axis=1, dtype=dtype)
+    return x_bits, o_bits
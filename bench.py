@@ -0,0 +1,306 @@
+"""Benchmark suite with JSON baselines.
+
+    python bench.py                                   # run everything and print
+    python bench.py --only engine,ai --quick          # a subset, smaller workloads
+    python bench.py --save bench_baseline.json        # record a baseline
+    python bench.py --compare bench_baseline.json     # exit 1 on a regression
+
+Groups:
+    engine  check_winner / is_board_full throughput
+    ai      get_easy_move / get_smart_move latency
+    play    full-game self-play throughput (single process)
+    stats   StatsDB write and read cost as the history grows
+    tk      board widget construction (skipped without a display)
+
+Workloads use fixed seeds, and each timing is the best of --repeat runs,
+so results only move when the code or the machine does. Every result has
+a unit and says whether higher or lower is better; --compare flags any
+result more than --threshold (a fraction) worse than the baseline. Only
+compare baselines taken on the same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+DEFAULT_THRESHOLD = 0.20
+HIGHER, LOWER = "higher", "lower"
+
+
+def best_of(repeat, run):
+    """Smallest wall time of repeat calls to run(), after one untimed warm-up"""
+    run()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def result(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def random_positions(size, count, seed=0):
+    """Unfinished positions reached by random play, from empty to nearly full"""
+    from engine import GameState
+
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState(size)
+        for _ in range(rng.randrange(size * size)):
+            moves = state.legal_moves()
+            state.make_move(*rng.choice(moves))
+            if state.is_over:
+                state.undo_move()
+                break
+        positions.append(state)
+    return positions
+
+
+def bench_engine(scale, repeat):
+    results = {}
+    for size in (3, 9):
+        positions = random_positions(size, 200, seed=size)
+        calls = max(1, 100 * scale) * len(positions)
+
+        def run_check_winner():
+            for _ in range(max(1, 100 * scale)):
+                for state in positions:
+                    state.check_winner("X")
+                    state.check_winner("O")
+
+        def run_board_full():
+            for _ in range(max(1, 100 * scale)):
+                for state in positions:
+                    state.is_board_full()
+
+        results[f"engine.check_winner.{size}x{size}"] = result(
+            2 * calls / best_of(repeat, run_check_winner), "calls/s", HIGHER)
+        results[f"engine.is_board_full.{size}x{size}"] = result(
+            calls / best_of(repeat, run_board_full), "calls/s", HIGHER)
+    return results
+
+
+def bench_ai(scale, repeat):
+    from ai import get_easy_move, get_smart_move
+
+    results = {}
+    for size in (3, 9):
+        positions = [state for state in random_positions(size, 300, seed=100 + size) if not state.is_over]
+        rounds = max(1, 5 * scale)
+        for name, pick in (("get_easy_move", get_easy_move), ("get_smart_move", get_smart_move)):
+            def run():
+                rng = random.Random(0)
+                for _ in range(rounds):
+                    for state in positions:
+                        pick(state, rng)
+            seconds = best_of(repeat, run)
+            results[f"ai.{name}.{size}x{size}"] = result(seconds / (rounds * len(positions)), "s/move", LOWER)
+    return results
+
+
+def bench_play(scale, repeat):
+    from selfplay import run_tournament
+
+    results = {}
+    for x, o, games in (("smart", "smart", 400), ("medium", "hard", 200)):
+        games = max(10, games * scale)
+        seconds = best_of(repeat, lambda: run_tournament(x, o, games, workers=1))
+        results[f"play.{x}_vs_{o}.3x3"] = result(games / seconds, "games/s", HIGHER)
+    return results
+
+
+def sample_games(count, seed=0):
+    """Finished gamelog records from random 3x3 games between a few players"""
+    from engine import GameState
+    from gamelog import make_record
+
+    rng = random.Random(seed)
+    names = [f"player{i}" for i in range(20)]
+    games = []
+    for index in range(count):
+        state = GameState()
+        while not state.is_over:
+            state.make_move(*rng.choice(state.legal_moves()))
+        players = {"X": rng.choice(names), "O": rng.choice(names)}
+        mode = "single" if index % 2 else "multi"
+        games.append(make_record(players, mode, "Hard", 3, 3, state.moves_history, state.winner,
+                                 "2024-01-01T00:00:00", "2024-01-01T00:01:00"))
+    return games
+
+
+def bench_stats(scale, repeat):
+    from statsdb import StatsDB
+
+    results = {}
+    batch = 200
+    checkpoints = [100 * scale, 1000 * scale, 10000 * scale]
+    games = sample_games(batch)
+    workdir = tempfile.mkdtemp(prefix="tictactoe-bench-")
+    try:
+        db = StatsDB(os.path.join(workdir, "stats.db"), os.path.join(workdir, "none.jsonl"),
+                     os.path.join(workdir, "none.json"))
+        stored = 0
+        for checkpoint in checkpoints:
+            # Grow the history in bulk, then time writes and reads at that size
+            while stored < checkpoint:
+                with db.conn:
+                    for game in games[:min(batch, checkpoint - stored)]:
+                        db._insert(game)
+                stored += min(batch, checkpoint - stored)
+
+            def run_writes():
+                for game in games[:10]:
+                    db.record(game)
+            results[f"stats.record@{checkpoint}"] = result(best_of(repeat, run_writes) / 10, "s/game", LOWER)
+            stored += 10 * (repeat + 1)
+
+            def run_reads():
+                db.counters()
+                db.counters(difficulty="Hard", mode="single")
+                db.player_record("player0")
+                db.leaderboard(10)
+                db.recent_games(50)
+            results[f"stats.read@{checkpoint}"] = result(best_of(repeat, run_reads), "s/refresh", LOWER)
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_tk(scale, repeat):
+    import tkinter as tk
+    from boardview import make_board
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return {}  # no display
+    root.withdraw()
+    colors = {"bg": "#2C3E50", "text": "#ECF0F1", "empty": "#34495E", "highlight": "#F1C40F",
+              "X": "#3498DB", "O": "#2ECC71"}
+    results = {}
+    try:
+        for size in (3, 5, 9, 19):
+            def run():
+                board = make_board(root, size, lambda row, col: None, colors)
+                board.frame.pack()
+                root.update_idletasks()
+                board.frame.destroy()
+            results[f"tk.make_board.{size}x{size}"] = result(best_of(repeat * max(1, scale), run), "s/board", LOWER)
+    finally:
+        root.destroy()
+    return results
+
+
+GROUPS = {
+    "engine": bench_engine,
+    "ai": bench_ai,
+    "play": bench_play,
+    "stats": bench_stats,
+    "tk": bench_tk,
+}
+
+
+def run_suite(groups=None, quick=False, repeat=5):
+    """Run the named groups (default: all); returns a report dict"""
+    scale = 1 if quick else 4
+    results = {}
+    for name in groups or GROUPS:
+        results.update(GROUPS[name](scale, repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """(name, baseline value, new value, change, regressed) for results present in both.
+
+    change is the fractional improvement; negative means slower.
+    """
+    rows = []
+    for name, old in sorted(baseline["results"].items()):
+        new = report["results"].get(name)
+        if new is None or not old["value"] or not new["value"]:
+            continue
+        if old["better"] == HIGHER:
+            change = new["value"] / old["value"] - 1
+        else:
+            change = old["value"] / new["value"] - 1
+        rows.append((name, old["value"], new["value"], change, change < -threshold))
+    return rows
+
+
+def format_value(value, unit):
+    if unit.startswith("s/"):
+        if value < 1e-3:
+            return f"{value * 1e6:.1f}us{unit[1:]}"
+        return f"{value * 1e3:.2f}ms{unit[1:]}"
+    return f"{value:,.0f} {unit}"
+
+
+def save(report, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--only", default=None, help="comma separated groups: " + ",".join(GROUPS))
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing; the best is kept")
+    parser.add_argument("--save", default=None, metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", default=None, metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction worse than the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(",") if args.only else None
+    for name in groups or ():
+        if name not in GROUPS:
+            parser.error(f"unknown group {name!r}")
+    report = run_suite(groups, args.quick, args.repeat)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("quick") != report["meta"]["quick"]:
+            print("warning: baseline and this run use different workload sizes (--quick)")
+        regressions = 0
+        for name, old, new, change, regressed in compare(report, baseline, args.threshold):
+            unit = report["results"][name]["unit"]
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<32} {format_value(old, unit):>18} -> {format_value(new, unit):>18} {change:+7.1%}{flag}")
+            regressions += regressed
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    else:
+        for name, entry in sorted(report["results"].items()):
+            print(f"{name:<32} {format_value(entry['value'], entry['unit']):>18}")
+
+    if args.save:
+        save(report, args.save)
+    return 1 if args.compare and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
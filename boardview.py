@@ -0,0 +1,224 @@
+"""Tk board widgets that redraw only what changed.
+
+A board remembers what each cell currently shows, so updates are applied
+as diffs: a move reconfigures one cell, and sync() after a rematch or a
+replay seek touches only the cells that differ from the new position.
+
+ButtonBoard is a grid of buttons, fine for small boards. CanvasBoard
+draws everything on one Canvas, hit-tests clicks from coordinates and
+batches changed cells into a single redraw, so gomoku-sized boards stay
+responsive. make_board picks between them by size.
+
+    python boardview.py --size 19 --frames 200    # redraw benchmark (needs a display)
+"""
+
+import argparse
+import random
+import time
+import tkinter as tk
+
+from engine import EMPTY
+
+# Boards up to this size use buttons; larger ones use the canvas renderer
+BUTTON_BOARD_MAX = 5
+CANVAS_PIXELS = 440
+
+
+class BoardView:
+    """Cell bookkeeping shared by the renderers; subclasses implement _draw"""
+
+    def __init__(self, size, colors):
+        self.size = size
+        self.colors = colors  # "bg", "text", "empty", "highlight", "X", "O"
+        self.cells = {}  # (row, col) -> "X" or "O" as currently drawn
+        self.highlighted = set()
+
+    def _draw(self, row, col, player, highlight=False):
+        raise NotImplementedError
+
+    def paint(self, row, col, player):
+        """Show player ("X", "O" or EMPTY) at a cell, skipping no-op updates"""
+        cell = (row, col)
+        if player == "X" or player == "O":
+            if self.cells.get(cell) == player and cell not in self.highlighted:
+                return
+            self.cells[cell] = player
+        elif cell in self.cells:
+            del self.cells[cell]
+        else:
+            return
+        self.highlighted.discard(cell)
+        self._draw(row, col, player)
+
+    def sync(self, moves):
+        """Show exactly the given (row, col, player) moves, touching only cells that differ"""
+        self.clear_highlight()
+        target = {(row, col): player for row, col, player in moves}
+        for row, col in [cell for cell in self.cells if cell not in target]:
+            self.paint(row, col, EMPTY)
+        for (row, col), player in target.items():
+            self.paint(row, col, player)
+
+    def highlight(self, cells):
+        for row, col in cells:
+            self.highlighted.add((row, col))
+            self._draw(row, col, self.cells.get((row, col)), highlight=True)
+
+    def clear_highlight(self):
+        for row, col in self.highlighted:
+            self._draw(row, col, self.cells.get((row, col)))
+        self.highlighted.clear()
+
+
+class ButtonBoard(BoardView):
+    """Grid of tk.Button cells; on_click(row, col) is called for clicks"""
+
+    def __init__(self, parent, size, on_click, colors):
+        super().__init__(size, colors)
+        self.frame = tk.Frame(parent, bg=colors["bg"], pady=20)
+
+        # Shrink cells so larger boards still fit the window
+        cell_font = ("Helvetica", max(7, 72 // size), "bold")
+        cell_width = max(1, 12 // size)
+        cell_height = max(1, 6 // size)
+        cell_pad = max(0, 15 // size)
+
+        self.buttons = []
+        for i in range(size):
+            row = []
+            for j in range(size):
+                button = tk.Button(
+                    self.frame,
+                    text="",
+                    font=cell_font,
+                    width=cell_width,
+                    height=cell_height,
+                    bg=colors["empty"],
+                    fg=colors["text"],
+                    command=lambda r=i, c=j: on_click(r, c)
+                )
+                button.grid(row=i, column=j, padx=cell_pad, pady=cell_pad)
+                row.append(button)
+            self.buttons.append(row)
+
+    def _draw(self, row, col, player, highlight=False):
+        button = self.buttons[row][col]
+        if player == "X" or player == "O":
+            button.config(
+                text=player,
+                bg=self.colors["highlight"] if highlight else self.colors[player],
+                state=tk.DISABLED
+            )
+        else:
+            button.config(text="", bg=self.colors["empty"], state=tk.NORMAL)
+
+
+class CanvasBoard(BoardView):
+    """One Canvas with a rectangle and a text item per cell.
+
+    _draw only marks cells dirty; the changes are flushed together from an
+    idle callback, so a sync() or a replay seek costs one redraw however
+    many cells it touches.
+    """
+
+    def __init__(self, parent, size, on_click, colors, pixels=CANVAS_PIXELS):
+        super().__init__(size, colors)
+        self.on_click = on_click
+        self.cell_pixels = max(8, pixels // size)
+        side = self.cell_pixels * size
+        self.frame = tk.Frame(parent, bg=colors["bg"], pady=20)
+        self.canvas = tk.Canvas(self.frame, width=side, height=side, bg=colors["bg"], highlightthickness=0)
+        self.canvas.pack()
+
+        cell_font = ("Helvetica", max(7, self.cell_pixels * 11 // 20), "bold")
+        gap = 1 if size > 9 else 2
+        self.rects = []
+        self.texts = []
+        for index in range(size * size):
+            row, col = divmod(index, size)
+            x0, y0 = col * self.cell_pixels, row * self.cell_pixels
+            x1, y1 = x0 + self.cell_pixels, y0 + self.cell_pixels
+            self.rects.append(self.canvas.create_rectangle(
+                x0 + gap, y0 + gap, x1 - gap, y1 - gap, fill=colors["empty"], width=0
+            ))
+            self.texts.append(self.canvas.create_text(
+                (x0 + x1) // 2, (y0 + y1) // 2, text="", fill=colors["text"], font=cell_font
+            ))
+        self.canvas.bind("<Button-1>", self._click)
+
+        self.dirty = set()
+        self.flush_job = None
+
+    def _click(self, event):
+        # Hit-test from coordinates; occupied cells ignore clicks like disabled buttons
+        row, col = event.y // self.cell_pixels, event.x // self.cell_pixels
+        if 0 <= row < self.size and 0 <= col < self.size and (row, col) not in self.cells:
+            self.on_click(row, col)
+
+    def _draw(self, row, col, player, highlight=False):
+        self.dirty.add(row * self.size + col)
+        if self.flush_job is None:
+            self.flush_job = self.canvas.after_idle(self.flush)
+
+    def flush(self):
+        """Redraw every dirty cell from the current state"""
+        self.flush_job = None
+        size, colors = self.size, self.colors
+        itemconfig = self.canvas.itemconfigure
+        for index in self.dirty:
+            cell = divmod(index, size)
+            player = self.cells.get(cell)
+            if player is None:
+                fill, text = colors["empty"], ""
+            else:
+                fill, text = colors["highlight"] if cell in self.highlighted else colors[player], player
+            itemconfig(self.rects[index], fill=fill)
+            itemconfig(self.texts[index], text=text)
+        self.dirty.clear()
+
+
+def make_board(parent, size, on_click, colors):
+    if size > BUTTON_BOARD_MAX:
+        return CanvasBoard(parent, size, on_click, colors)
+    return ButtonBoard(parent, size, on_click, colors)
+
+
+def run_bench(size=19, frames=200, seed=0):
+    """Time full-board redraws for both renderers; returns {name: seconds per frame}"""
+    rng = random.Random(seed)
+    colors = {"bg": "#2C3E50", "text": "#ECF0F1", "empty": "#34495E", "highlight": "#F1C40F",
+              "X": "#3498DB", "O": "#2ECC71"}
+    cells = [divmod(index, size) for index in range(size * size)]
+    positions = []
+    for _ in range(frames):
+        played = rng.sample(cells, rng.randrange(len(cells) // 2, len(cells)))
+        positions.append([(row, col, "XO"[i % 2]) for i, (row, col) in enumerate(played)])
+
+    root = tk.Tk()
+    results = {}
+    for name, board_class in (("canvas", CanvasBoard), ("buttons", ButtonBoard)):
+        board = board_class(root, size, lambda row, col: None, colors)
+        board.frame.pack()
+        root.update()
+        start = time.perf_counter()
+        for moves in positions:
+            board.sync(moves)
+            root.update_idletasks()  # runs the flush and the actual redraw
+        results[name] = (time.perf_counter() - start) / frames
+        board.frame.destroy()
+    root.destroy()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark board redraws")
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    for name, seconds in run_bench(args.size, args.frames).items():
+        print(f"{name:>8}: {seconds * 1e3:.2f}ms per full redraw ({1 / seconds:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
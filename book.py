@@ -0,0 +1,161 @@
+"""Precomputed tic-tac-toe move table.
+
+Every position reachable from the empty board is solved once and written to
+tictactoe_book.bin. Positions are stored once per symmetry class (see
+symmetry.py): the file is a header with the entry count, a sorted array of
+2-byte canonical base-3 board indexes (X = 1, O = 2 per cell), then one
+2-byte little-endian entry per index:
+
+    bits 0-8    mask of every optimal cell for the side to move, on the
+                canonical board
+    bits 9-13   score for the side to move, offset by SCORE_BIAS
+    bit  15     always set for a solved, unfinished position
+
+The game loads it with mmap, so a Hard move is a canonicalization, a binary
+search over a few hundred keys and a two-byte read. Run ``python book.py``
+to regenerate the file.
+"""
+
+import mmap
+import os
+import struct
+
+from engine import CELL_BITS, FULL_MASK, iter_bits, is_win
+import solver
+from symmetry import canonical, restore_cell
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe_book.bin")
+MAGIC = b"TTTB"
+VERSION = 2
+HEADER = struct.Struct("<4sBxxxI")
+ENTRY = struct.Struct("<H")
+SCORE_BIAS = 16
+PRESENT = 1 << 15
+
+# Base-3 weight of every 9-bit cell mask, so an index is two table lookups
+BASE3 = tuple(sum(3 ** i for i in iter_bits(mask)) for mask in range(1 << 9))
+
+
+def position_index(x_bits, o_bits):
+    return BASE3[x_bits] + 2 * BASE3[o_bits]
+
+
+def pack_entry(score, moves):
+    mask = 0
+    for i in moves:
+        mask |= CELL_BITS[i]
+    return PRESENT | (score + SCORE_BIAS) << 9 | mask
+
+
+def unpack_entry(value):
+    if not value & PRESENT:
+        return None
+    score = (value >> 9 & 0x1F) - SCORE_BIAS
+    return score, list(iter_bits(value & FULL_MASK))
+
+
+def reachable_positions():
+    """Yield (x_bits, o_bits) for every unfinished position reachable from the empty board,
+    one per symmetry class"""
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x_bits, o_bits, _ = canonical(*stack.pop())
+        if (x_bits, o_bits) in seen:
+            continue
+        seen.add((x_bits, o_bits))
+        yield x_bits, o_bits
+
+        x_to_move = bin(x_bits).count("1") == bin(o_bits).count("1")
+        for i in iter_bits(FULL_MASK & ~(x_bits | o_bits)):
+            if x_to_move:
+                child = (x_bits | CELL_BITS[i], o_bits)
+            else:
+                child = (x_bits, o_bits | CELL_BITS[i])
+            full = child[0] | child[1] == FULL_MASK
+            if not (full or is_win(child[0]) or is_win(child[1])):
+                stack.append(child)
+
+
+def build(path=BOOK_FILE):
+    """Solve every reachable position and write the table to path"""
+    entries = {}
+    for x_bits, o_bits in reachable_positions():
+        x_to_move = bin(x_bits).count("1") == bin(o_bits).count("1")
+        me, opp = (x_bits, o_bits) if x_to_move else (o_bits, x_bits)
+        score, moves = solver.best_moves(me, opp)
+        entries[position_index(x_bits, o_bits)] = pack_entry(score, moves)
+
+    keys = sorted(entries)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        f.write(struct.pack(f"<{len(keys)}H", *keys))
+        f.write(struct.pack(f"<{len(keys)}H", *(entries[key] for key in keys)))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class OpeningBook:
+    """Read-only, mmap-backed view of a table written by build()"""
+
+    def __init__(self, path=BOOK_FILE):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or len(self.data) != HEADER.size + 2 * self.count * ENTRY.size:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} move book")
+        self.entries_offset = HEADER.size + self.count * ENTRY.size
+
+    def _find(self, key):
+        # Binary search over the sorted key array
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if ENTRY.unpack_from(self.data, HEADER.size + mid * ENTRY.size)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.count and ENTRY.unpack_from(self.data, HEADER.size + low * ENTRY.size)[0] == key:
+            return low
+        return None
+
+    def lookup(self, x_bits, o_bits):
+        """Return (score, optimal cell indexes) for the side to move, or None"""
+        canon_x, canon_o, t = canonical(x_bits, o_bits)
+        slot = self._find(position_index(canon_x, canon_o))
+        if slot is None:
+            return None
+        score, moves = unpack_entry(ENTRY.unpack_from(self.data, self.entries_offset + slot * ENTRY.size)[0])
+        return score, [restore_cell(cell, t) for cell in moves]
+
+    def best_move(self, state, rng=None):
+        entry = self.lookup(state.bits["X"], state.bits["O"])
+        if entry is None or not entry[1]:
+            return None
+        moves = entry[1]
+        move = rng.choice(moves) if rng is not None else moves[0]
+        return divmod(move, 3)
+
+    def close(self):
+        self.data.close()
+
+
+_book = None
+
+
+def load_book():
+    """Shared book instance, or None when the file is missing or unreadable"""
+    global _book
+    if _book is None:
+        try:
+            _book = OpeningBook()
+        except (OSError, ValueError):
+            _book = False
+    return _book or None
+
+
+if __name__ == "__main__":
+    written = build()
+    print(f"Wrote {written} positions to {BOOK_FILE}")
@@ -0,0 +1,263 @@
+from functools import lru_cache
+
+EMPTY = " "
+PLAYERS = ("X", "O")
+TIE = "tie"
+
+# Board sizes offered in the UI as (size, win length)
+BOARD_PRESETS = ((3, 3), (4, 4), (5, 4), (7, 5), (9, 5), (15, 5), (19, 5))
+
+
+def default_win_length(size):
+    return min(size, 5)
+
+
+def splitmix64(seed):
+    """Yield a deterministic stream of 64-bit numbers, the same in every process"""
+    while True:
+        seed = (seed + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = seed
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        yield z ^ (z >> 31)
+
+
+class Geometry:
+    """Precomputed bit layout and win lines for a size x size, win_length-in-a-row board.
+
+    Cell (row, col) is bit row * size + col of a player's bitboard.
+    """
+
+    def __init__(self, size, win_length):
+        if size < 1 or not 1 <= win_length <= size:
+            raise ValueError(f"invalid board: {size}x{size} with {win_length} in a row")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.cell_bits = tuple(1 << i for i in range(self.cells))
+        self.full_mask = (1 << self.cells) - 1
+
+        # Every run of win_length cells: horizontal, vertical and both diagonals
+        lines = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + d_row * (win_length - 1)
+                    end_col = col + d_col * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append([(row + d_row * k, col + d_col * k) for k in range(win_length)])
+        self.win_lines = tuple(lines)
+        self.win_masks = tuple(self.line_mask(line) for line in lines)
+
+        # Lines through each cell, so a move only checks the lines it can complete
+        through = [[] for _ in range(self.cells)]
+        for index, line in enumerate(lines):
+            for row, col in line:
+                through[row * size + col].append(index)
+        self.lines_through = tuple(tuple(indexes) for indexes in through)
+        self.masks_through = tuple(
+            tuple(self.win_masks[index] for index in indexes) for indexes in self.lines_through
+        )
+
+        # Zobrist keys: one random number per (player, cell), plus one XORed in while O is to move
+        numbers = splitmix64(size * 1000 + win_length)
+        self.zobrist = {player: tuple(next(numbers) for _ in range(self.cells)) for player in PLAYERS}
+        self.zobrist_side = next(numbers)
+
+    def line_mask(self, cells):
+        mask = 0
+        for row, col in cells:
+            mask |= 1 << (row * self.size + col)
+        return mask
+
+    def is_win(self, bits):
+        """True if the bitboard contains a complete line anywhere"""
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def wins_through(self, bits, cell):
+        """True if the bitboard completes a line passing through cell"""
+        for mask in self.masks_through[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def position_key(self, x_bits, o_bits, to_move="X"):
+        """Zobrist key of a position computed from scratch; GameState.key keeps it up to date"""
+        key = self.zobrist_side if to_move == "O" else 0
+        for player, bits in (("X", x_bits), ("O", o_bits)):
+            keys = self.zobrist[player]
+            for cell in iter_bits(bits):
+                key ^= keys[cell]
+        return key
+
+
+@lru_cache(maxsize=None)
+def geometry(size=3, win_length=3):
+    return Geometry(size, win_length)
+
+
+# The classic 3x3 layout, used directly by the solver, book and symmetry tables
+CLASSIC = geometry(3, 3)
+CELL_BITS = CLASSIC.cell_bits
+FULL_MASK = CLASSIC.full_mask
+WIN_LINES = CLASSIC.win_lines
+WIN_MASKS = CLASSIC.win_masks
+
+
+def other_player(player):
+    return "O" if player == "X" else "X"
+
+
+def is_win(bits):
+    """True if the 3x3 bitboard contains a complete line"""
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def iter_bits(mask):
+    """Yield the cell index of every set bit in mask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class GameState:
+    """Headless tic-tac-toe game state, usable without Tk.
+
+    The position is held as one bitboard per player; board is a
+    list-of-lists view rebuilt on demand for display code. Only the lines
+    through the last move are checked for a win. key is the position's
+    Zobrist key, XOR-updated by make_move and undo_move.
+    """
+
+    def __init__(self, size=3, win_length=None):
+        self.geometry = geometry(size, win_length or default_win_length(size))
+        self.reset()
+
+    def reset(self):
+        self.bits = {"X": 0, "O": 0}
+        self.key = 0
+        self.current_player = "X"
+        self.moves_history = []
+        self.winner = None  # "X", "O", TIE or None while the game is running
+
+    def copy(self):
+        state = GameState.__new__(GameState)
+        state.geometry = self.geometry
+        state.bits = dict(self.bits)
+        state.key = self.key
+        state.current_player = self.current_player
+        state.moves_history = list(self.moves_history)
+        state.winner = self.winner
+        return state
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    @property
+    def win_length(self):
+        return self.geometry.win_length
+
+    @property
+    def is_classic(self):
+        return self.geometry is CLASSIC
+
+    @property
+    def board(self):
+        return [[self.cell(i, j) for j in range(self.size)] for i in range(self.size)]
+
+    @property
+    def occupied(self):
+        return self.bits["X"] | self.bits["O"]
+
+    @property
+    def free(self):
+        return self.geometry.full_mask & ~self.occupied
+
+    @property
+    def is_over(self):
+        return self.winner is not None
+
+    def cell(self, row, col):
+        bit = self.geometry.cell_bits[row * self.size + col]
+        if self.bits["X"] & bit:
+            return "X"
+        if self.bits["O"] & bit:
+            return "O"
+        return EMPTY
+
+    def is_legal(self, row, col):
+        if self.winner is not None or not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        return not self.occupied & self.geometry.cell_bits[row * self.size + col]
+
+    def legal_moves(self):
+        if self.winner is not None:
+            return []
+        return [divmod(i, self.size) for i in iter_bits(self.free)]
+
+    def make_move(self, row, col):
+        """Play current_player at (row, col). Returns False if the move is illegal"""
+        if not self.is_legal(row, col):
+            return False
+
+        player = self.current_player
+        cell = row * self.size + col
+        self.moves_history.append((row, col, player))
+        bits = self.bits[player] | self.geometry.cell_bits[cell]
+        self.bits[player] = bits
+        self.key ^= self.geometry.zobrist[player][cell]
+
+        if self.geometry.wins_through(bits, cell):
+            self.winner = player
+        elif self.is_board_full():
+            self.winner = TIE
+        else:
+            # The player to move only changes while the game is still running
+            self.current_player = other_player(player)
+            self.key ^= self.geometry.zobrist_side
+        return True
+
+    def undo_move(self):
+        """Take back the last move and return it as (row, col, player)"""
+        if not self.moves_history:
+            return None
+
+        row, col, player = self.moves_history.pop()
+        cell = row * self.size + col
+        self.bits[player] &= ~self.geometry.cell_bits[cell]
+        self.key ^= self.geometry.zobrist[player][cell]
+        if self.current_player != player:
+            self.key ^= self.geometry.zobrist_side
+        self.current_player = player
+        self.winner = None
+        return row, col, player
+
+    def check_winner(self, player):
+        return self.geometry.is_win(self.bits[player])
+
+    def winning_cells(self, player):
+        """Return the cells of a completed line for player, or None"""
+        geometry = self.geometry
+        bits = self.bits[player]
+        # A finished game can only have been won through its last move
+        if self.moves_history and self.moves_history[-1][2] == player:
+            row, col, _ = self.moves_history[-1]
+            indexes = geometry.lines_through[row * self.size + col]
+        else:
+            indexes = range(len(geometry.win_masks))
+        for index in indexes:
+            mask = geometry.win_masks[index]
+            if bits & mask == mask:
+                return geometry.win_lines[index]
+        return None
+
+    def is_board_full(self):
+        return self.occupied == self.geometry.full_mask
@@ -0,0 +1,207 @@
+"""Append-only game history with incrementally maintained counters.
+
+Every finished game is one JSON line in tictactoe_games.jsonl. Lines are
+buffered and written in batches, each batch followed by an fsync, so the
+cost per game does not depend on how long the history is. The aggregate
+counters live in memory and are snapshotted to tictactoe_stats.json along
+with the log offset they cover; on start-up only the log written after
+that offset is replayed, and a torn last line left by a crash is cut off.
+Several processes can share the same files; see GameLog.
+
+The game itself records into statsdb.StatsDB, which gets the same safety
+from SQLite (WAL mode and a busy timeout) and only reads these files once
+to migrate them. GameLog remains the writer for selfplay.py --log.
+"""
+
+import json
+import os
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+
+import metrics
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOG_FILE = os.path.join(HERE, "tictactoe_games.jsonl")
+COUNTERS_FILE = os.path.join(HERE, "tictactoe_stats.json")
+COUNTER_KEYS = ("games_played", "player_wins", "cpu_wins", "ties")
+
+
+def empty_counters():
+    return {key: 0 for key in COUNTER_KEYS}
+
+
+def count_game(counters, game):
+    """Add one game record to the aggregate counters"""
+    counters["games_played"] += 1
+    result = game["result"]
+    if result == "tie":
+        counters["ties"] += 1
+    elif result == "O" and game["mode"] == "single":
+        counters["cpu_wins"] += 1
+    else:
+        counters["player_wins"] += 1
+
+
+def make_record(players, mode, difficulty, size, win_length, moves, result, started_at, ended_at=None):
+    """Build a log record; moves are (row, col, player) tuples"""
+    return {
+        "players": dict(players),
+        "mode": mode,
+        "difficulty": difficulty if mode == "single" else None,
+        "size": size,
+        "win_length": win_length,
+        "moves": [[row, col] for row, col, _ in moves],
+        "first": moves[0][2] if moves else "X",
+        "result": result,
+        "started_at": started_at,
+        "ended_at": ended_at or datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def read_records(path, offset=0):
+    """Yield (record, end offset) for every complete line from offset on"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash; everything after it is suspect
+            offset += len(line)
+            try:
+                yield json.loads(line), offset
+            except ValueError:
+                continue
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path + ".lock" (shared by all processes)"""
+    with open(path + ".lock", "a+b") as f:
+        if msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class GameLog:
+    """Process-safe writer for the game log and its counters snapshot.
+
+    Every disk update happens under file_lock: the snapshot is re-read,
+    caught up with any games other processes logged, has this process's
+    batch added as a delta and is written back with an atomic rename. A
+    crash at any point leaves either the old or the new snapshot, and the
+    log tail it does not cover is recounted by the next writer.
+    """
+
+    def __init__(self, path=LOG_FILE, counters_path=COUNTERS_FILE, batch_size=16):
+        self.path = path
+        self.counters_path = counters_path
+        self.batch_size = batch_size
+        self.pending = []
+        self.pending_counts = empty_counters()
+        with file_lock(self.counters_path):
+            self.counters, self.offset = self._sync()
+
+    def _load_counters(self):
+        try:
+            with open(self.counters_path, "r") as f:
+                snapshot = json.load(f)
+            counters = {key: int(snapshot.get(key, 0)) for key in COUNTER_KEYS}
+            # Files from before the log existed have no offset: their counts are a base total
+            return counters, int(snapshot.get("log_offset", 0))
+        except FileNotFoundError:
+            return empty_counters(), 0
+        except (OSError, ValueError, TypeError, AttributeError):
+            # Never silently reset: keep the damaged file and rebuild from the log
+            os.replace(self.counters_path, self.counters_path + ".corrupt")
+            warnings.warn(f"{self.counters_path} is unreadable (kept as {self.counters_path}.corrupt); "
+                          f"counters were rebuilt from {self.path}, without any counts from before the log",
+                          RuntimeWarning)
+            return empty_counters(), 0
+
+    def _sync(self):
+        # Caller holds the lock. Returns the on-disk counters, caught up with the log
+        counters, offset = self._load_counters()
+        caught_up = offset
+        for game, end in read_records(self.path, offset):
+            count_game(counters, game)
+            caught_up = end
+
+        # Drop a torn tail so the next append starts on a clean line
+        if os.path.exists(self.path) and os.path.getsize(self.path) > caught_up:
+            os.truncate(self.path, caught_up)
+        if caught_up != offset:
+            self._write_counters(counters, caught_up)
+        return counters, caught_up
+
+    def _write_counters(self, counters, offset):
+        snapshot = dict(counters, log_offset=offset)
+        tmp_path = f"{self.counters_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.counters_path)
+
+    def record(self, game):
+        """Queue one finished game; written to disk with the next batch"""
+        count_game(self.pending_counts, game)
+        count_game(self.counters, game)
+        self.pending.append(json.dumps(game, separators=(",", ":")) + "\n")
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    @metrics.timed("gamelog.flush")
+    def flush(self):
+        if not self.pending:
+            return
+        metrics.count("gamelog.writes", len(self.pending))
+        data = "".join(self.pending).encode("utf-8")
+        with file_lock(self.counters_path):
+            counters, _ = self._sync()
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+            # Merge this batch as a delta on top of whatever other processes wrote
+            for key in COUNTER_KEYS:
+                counters[key] += self.pending_counts[key]
+            self._write_counters(counters, offset)
+        self.counters, self.offset = counters, offset
+        self.pending = []
+        self.pending_counts = empty_counters()
+
+    def games(self):
+        """Stream every logged game, oldest first"""
+        for game, _ in read_records(self.path):
+            yield game
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,215 @@
+"""Compact game state and a pooled allocator for hosting many games at once.
+
+CompactGame plays by the same rules as engine.GameState and offers the
+parts of its interface the server uses. It is built for memory instead
+of convenience:
+- __slots__ and no per-game dicts.
+- One int bitboard per player.
+- Moves as one byte per cell index, or two bytes above 16x16, in a
+  bytearray or array.
+- The player to move is derived from the move count.
+- No Zobrist key: the server never looks positions up. to_state() gives
+  a GameState, which keeps one, for code that does.
+GamePool keeps released games on per-board-shape free lists. A finished
+game's object and move buffer are reset and handed to the next game
+instead of being reallocated.
+
+    python gamepool.py --games 100000 --size 3    # bytes per live game, hosted and bare
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+from array import array
+
+from engine import PLAYERS, TIE, GameState, default_win_length, geometry, iter_bits
+
+# Budget for a live 3x3 game mid-play as the server holds it: the CompactGame, its
+# ServerGame and its entry in GameServer.games. Checked by python gamepool.py (about 300 bytes
+# measured, of which the CompactGame is about 150)
+BYTES_PER_GAME_BUDGET = 320
+MAX_FREE_PER_SHAPE = 10_000
+
+
+class CompactGame:
+    __slots__ = ("geometry", "x", "o", "moves", "winner")
+
+    def __init__(self, size=3, win_length=None):
+        self.geometry = geometry(size, win_length or default_win_length(size))
+        self.moves = bytearray() if self.geometry.cells <= 256 else array("H")
+        self.reset()
+
+    def reset(self):
+        self.x = self.o = 0
+        del self.moves[:]  # keeps the buffer for the next game
+        self.winner = None  # "X", "O", TIE or None while the game is running
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    @property
+    def win_length(self):
+        return self.geometry.win_length
+
+    @property
+    def current_player(self):
+        # X always starts; a finished game stays on the player who moved last, like GameState
+        count = len(self.moves)
+        if self.winner is not None:
+            count -= 1
+        return PLAYERS[count & 1]
+
+    @property
+    def is_over(self):
+        return self.winner is not None
+
+    @property
+    def bits(self):
+        return {"X": self.x, "O": self.o}
+
+    @property
+    def moves_history(self):
+        size = self.geometry.size
+        return [(*divmod(cell, size), PLAYERS[i & 1]) for i, cell in enumerate(self.moves)]
+
+    def is_legal(self, row, col):
+        size = self.geometry.size
+        if self.winner is not None or not (0 <= row < size and 0 <= col < size):
+            return False
+        return not (self.x | self.o) & self.geometry.cell_bits[row * size + col]
+
+    def legal_moves(self):
+        if self.winner is not None:
+            return []
+        free = self.geometry.full_mask & ~(self.x | self.o)
+        return [divmod(cell, self.geometry.size) for cell in iter_bits(free)]
+
+    def make_move(self, row, col):
+        """Play the player to move at (row, col). Returns False if the move is illegal"""
+        if not self.is_legal(row, col):
+            return False
+        board = self.geometry
+        cell = row * board.size + col
+        if len(self.moves) & 1:
+            player, bits = "O", self.o | board.cell_bits[cell]
+            self.o = bits
+        else:
+            player, bits = "X", self.x | board.cell_bits[cell]
+            self.x = bits
+        self.moves.append(cell)
+
+        if board.wins_through(bits, cell):
+            self.winner = player
+        elif self.x | self.o == board.full_mask:
+            self.winner = TIE
+        return True
+
+    def undo_move(self):
+        """Take back the last move and return it as (row, col, player)"""
+        if not self.moves:
+            return None
+        cell = self.moves.pop()
+        if len(self.moves) & 1:
+            player = "O"
+            self.o &= ~self.geometry.cell_bits[cell]
+        else:
+            player = "X"
+            self.x &= ~self.geometry.cell_bits[cell]
+        self.winner = None
+        return (*divmod(cell, self.geometry.size), player)
+
+    def check_winner(self, player):
+        return self.geometry.is_win(self.x if player == "X" else self.o)
+
+    def is_board_full(self):
+        return self.x | self.o == self.geometry.full_mask
+
+    def to_state(self):
+        """An engine.GameState of the same position, for the AI and other full-featured code"""
+        state = GameState(self.geometry.size, self.geometry.win_length)
+        for row, col, _ in self.moves_history:
+            state.make_move(row, col)
+        return state
+
+
+class GamePool:
+    """Free lists of CompactGame objects per (size, win_length)"""
+
+    def __init__(self, max_free=MAX_FREE_PER_SHAPE):
+        self.max_free = max_free
+        self.free = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, size, win_length):
+        free = self.free.get((size, win_length))
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.created += 1
+        return CompactGame(size, win_length)
+
+    def release(self, game):
+        """Reset game and keep it for the next acquire of the same board shape"""
+        free = self.free.setdefault((game.geometry.size, game.geometry.win_length), [])
+        if len(free) < self.max_free:
+            game.reset()
+            free.append(game)
+
+    def __len__(self):
+        return sum(len(free) for free in self.free.values())
+
+
+def measure_bytes_per_game(make_game, games=100_000, moves=4, seed=0):
+    """Traced bytes per live game after make_game() has played moves random moves"""
+    rng = random.Random(seed)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    live = []
+    for _ in range(games):
+        game = make_game()
+        size = game.size
+        cells = size * size
+        for _ in range(moves):
+            if game.is_over:
+                break
+            # Retry random cells rather than listing the legal ones; boards here are far from full
+            while not game.make_move(*divmod(rng.randrange(cells), size)):
+                pass
+        live.append(game)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding the games is not part of any game
+    return (used - live.__sizeof__()) / games
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per live game")
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--moves", type=int, default=4, help="random moves played in each game")
+    args = parser.parse_args(argv)
+
+    from server import GameServer
+
+    win_length = args.win_length or default_win_length(args.size)
+    server = GameServer()
+    hosted = measure_bytes_per_game(lambda: server.create_game(args.size, win_length).state, args.games, args.moves)
+    compact = measure_bytes_per_game(lambda: CompactGame(args.size, win_length), args.games, args.moves)
+    full = measure_bytes_per_game(lambda: GameState(args.size, win_length), args.games, args.moves)
+    print(f"{args.games} live {args.size}x{args.size} games, {args.moves} moves each:")
+    print(f"  hosted by GameServer: {hosted:.0f} bytes/game ({hosted * args.games / 1e6:.1f} MB)")
+    print(f"  bare CompactGame:     {compact:.0f} bytes/game ({compact * args.games / 1e6:.1f} MB)")
+    print(f"  bare GameState:       {full:.0f} bytes/game ({full * args.games / 1e6:.1f} MB)")
+    if args.size == 3:
+        within = hosted <= BYTES_PER_GAME_BUDGET
+        print(f"  budget {BYTES_PER_GAME_BUDGET} bytes/game hosted: {'ok' if within else 'OVER'}")
+        return 0 if within else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
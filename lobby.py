@@ -0,0 +1,216 @@
+"""Matchmaking lobby for network play.
+
+Players wait in one bucket per board preset (size, win_length) and are
+paired in batches: each match() pass sorts a bucket by rating and pairs
+neighbours whose ratings are close enough. The allowed gap grows with
+waiting time, so nobody waits forever on a quiet server.
+
+The lobby is in memory and capped at max_waiting tickets. With a
+persist_path it also keeps a JSON snapshot of the queue; after a restart
+a player who queues again under the same name keeps their place in line.
+
+    python lobby.py --events 1000000 --memory
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+DEFAULT_RATING = 1500
+MAX_WAITING = 100_000
+
+# Allowed rating gap: BASE_GAP at first, widening by GAP_PER_SECOND up to MAX_GAP
+BASE_GAP = 100
+GAP_PER_SECOND = 50
+MAX_GAP = 800
+
+# Snapshot handling
+SAVE_INTERVAL = 5.0
+RESTORE_TTL = 120.0
+
+
+class LobbyFull(Exception):
+    pass
+
+
+class Ticket:
+    __slots__ = ("player", "name", "rating", "preset", "enqueued_at")
+
+    def __init__(self, player, name, rating, preset, enqueued_at):
+        self.player = player
+        self.name = name
+        self.rating = rating
+        self.preset = preset
+        self.enqueued_at = enqueued_at
+
+    def allowed_gap(self, now):
+        return min(MAX_GAP, BASE_GAP + GAP_PER_SECOND * (now - self.enqueued_at))
+
+
+class Lobby:
+    def __init__(self, max_waiting=MAX_WAITING, persist_path=None, clock=time.time):
+        self.max_waiting = max_waiting
+        self.persist_path = persist_path
+        self.clock = clock
+        self.buckets = {}  # preset -> {player: Ticket}, in arrival order
+        self.tickets = {}  # player -> Ticket
+        self.restored = {}  # name -> enqueued_at from the last snapshot
+        self.dirty = False
+        self.saved_at = 0.0
+        if persist_path:
+            self.load()
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def __contains__(self, player):
+        return player in self.tickets
+
+    def waiting(self, preset):
+        return len(self.buckets.get(preset, ()))
+
+    def join(self, player, name, rating, preset):
+        """Queue player (any hashable) for preset; raises LobbyFull at capacity"""
+        self.leave(player)
+        if len(self.tickets) >= self.max_waiting:
+            raise LobbyFull(f"lobby holds at most {self.max_waiting} players")
+        enqueued_at = self.restored.pop(name, None) or self.clock()
+        ticket = Ticket(player, name, rating, preset, enqueued_at)
+        self.tickets[player] = ticket
+        self.buckets.setdefault(preset, {})[player] = ticket
+        self.dirty = True
+        return ticket
+
+    def leave(self, player):
+        ticket = self.tickets.pop(player, None)
+        if ticket is None:
+            return False
+        bucket = self.buckets[ticket.preset]
+        del bucket[player]
+        if not bucket:
+            # Drop empty buckets so rarely used presets don't pile up
+            del self.buckets[ticket.preset]
+        self.dirty = True
+        return True
+
+    def match(self, now=None):
+        """Pair everyone that can be paired now; returns [(x_ticket, o_ticket)]"""
+        now = self.clock() if now is None else now
+        pairs = []
+        for bucket in list(self.buckets.values()):
+            if len(bucket) < 2:
+                continue
+            waiting = sorted(bucket.values(), key=lambda ticket: ticket.rating)
+            i = 0
+            while i < len(waiting) - 1:
+                first, second = waiting[i], waiting[i + 1]
+                # Either player's patience is enough to accept the gap
+                if second.rating - first.rating <= max(first.allowed_gap(now), second.allowed_gap(now)):
+                    # Whoever waited longer moves first
+                    if second.enqueued_at < first.enqueued_at:
+                        first, second = second, first
+                    pairs.append((first, second))
+                    i += 2
+                else:
+                    i += 1
+        for first, second in pairs:
+            self.leave(first.player)
+            self.leave(second.player)
+        return pairs
+
+    def expire_restored(self, now=None):
+        now = self.clock() if now is None else now
+        self.restored = {name: at for name, at in self.restored.items() if now - at < RESTORE_TTL}
+
+    def load(self):
+        try:
+            with open(self.persist_path, "r") as f:
+                snapshot = json.load(f)
+            waiting = snapshot["waiting"]
+        except (OSError, ValueError, TypeError, KeyError):
+            return
+        for entry in waiting[:self.max_waiting]:
+            if isinstance(entry, list) and len(entry) == 2:
+                self.restored[str(entry[0])] = float(entry[1])
+        self.expire_restored()
+
+    def save(self):
+        """Write the queue snapshot atomically"""
+        waiting = [[ticket.name, ticket.enqueued_at] for ticket in self.tickets.values()]
+        # Players who have not come back yet keep their claim until it expires
+        waiting.extend([name, at] for name, at in self.restored.items())
+        temp_path = self.persist_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"saved_at": self.clock(), "waiting": waiting}, f)
+        os.replace(temp_path, self.persist_path)
+        self.dirty = False
+
+    def maybe_save(self, now=None):
+        """Save if the queue changed and SAVE_INTERVAL has passed since the last save"""
+        now = self.clock() if now is None else now
+        if self.persist_path and self.dirty and now - self.saved_at >= SAVE_INTERVAL:
+            self.expire_restored(now)
+            self.save()
+            self.saved_at = now
+
+
+def run_bench(events=1_000_000, players=20_000, match_every=1000, seed=0, trace_memory=False):
+    """Random join/leave traffic with periodic matching; returns a summary dict"""
+    rng = random.Random(seed)
+    presets = ((3, 3), (4, 4), (5, 4), (7, 5), (9, 5), (15, 5), (19, 5))
+    now = 0.0
+    lobby = Lobby(max_waiting=players, clock=lambda: now)
+    matched = full = 0
+    if trace_memory:
+        # Tracing slows every allocation, so it is off for plain timing runs
+        tracemalloc.start()
+    start = time.perf_counter()
+    for event in range(events):
+        player = rng.randrange(players * 2)
+        if player in lobby:
+            lobby.leave(player)
+        else:
+            try:
+                lobby.join(player, f"p{player}", rng.gauss(DEFAULT_RATING, 300), rng.choice(presets))
+            except LobbyFull:
+                full += 1
+        if event % match_every == 0:
+            now += 0.1
+            matched += len(lobby.match(now))
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "events_per_second": events / elapsed,
+        "matches": matched,
+        "rejected": full,
+        "waiting": len(lobby),
+        "peak_bytes": peak,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matchmaking lobby")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=20_000, help="lobby capacity")
+    parser.add_argument("--match-every", type=int, default=1000, help="events between match passes")
+    parser.add_argument("--memory", action="store_true", help="also report peak memory (slower)")
+    args = parser.parse_args(argv)
+
+    result = run_bench(args.events, args.players, args.match_every, trace_memory=args.memory)
+    print(f"{result['events']} join/leave events in {result['seconds']:.2f}s: "
+          f"{result['events_per_second']:.0f} events/s")
+    print(f"  {result['matches']} matches, {result['rejected']} rejected as full, {result['waiting']} still waiting")
+    if result["peak_bytes"] is not None:
+        print(f"  peak traced memory {result['peak_bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Monte Carlo tree search (UCT) for boards too large to search exhaustively.
+
+Each playout walks down the tree by UCB1, adds one node and finishes the
+game with random moves on the two bitboards. Large boards only expand
+cells next to existing stones, like search.py, but rollouts may use any
+free cell.
+
+Play is spread over cores by root parallelism: every process grows its
+own tree from a different seed. The root statistics are summed and the
+most visited move is played. The calling process grows one of the trees
+itself. When cancel is set it raises a stop event shared with the pool,
+so the other trees stop within a few playouts instead of running out
+their budget. Processes come from a spawn-started pool that is created on
+first use and kept for later moves.
+
+    python mcts.py --size 9 --time-budget 1 --workers 4
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from engine import geometry, iter_bits, other_player
+import metrics
+from search import PRUNE_ABOVE, neighbour_masks
+
+EXPLORATION = 1.4
+CHECK_EVERY = 64  # playouts between budget checks
+
+_pool = None
+_pool_size = 0
+_pool_stop = None  # multiprocessing Event shared with the pool workers
+_worker_stop = None  # the same event, as seen inside a worker
+
+# Playouts, seconds and process count of the most recent search, for display
+last_run = {"playouts": 0, "seconds": 0.0, "workers": 0}
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, move, parent, untried, terminal=None):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0  # from the point of view of the player who made move
+        self.terminal = terminal  # result for that player if the game ended here: 1.0 or 0.5
+
+
+class Tree:
+    """One UCT tree over a geometry; the side to move at the root owns me"""
+
+    def __init__(self, board, me, opp, rng):
+        self.geometry = board
+        self.neighbours = neighbour_masks(board) if board.size > PRUNE_ABOVE else None
+        self.rng = rng
+        self.me, self.opp = me, opp
+        self.root = Node(None, None, self._candidates(me, opp))
+        self.playouts = 0
+
+    def _candidates(self, me, opp):
+        occupied = me | opp
+        free = self.geometry.full_mask & ~occupied
+        if self.neighbours is not None and not occupied:
+            centre = self.geometry.size // 2
+            return [centre * self.geometry.size + centre]
+        if self.neighbours is not None:
+            near = 0
+            for cell in iter_bits(occupied):
+                near |= self.neighbours[cell]
+            free = near & free or free
+        cells = list(iter_bits(free))
+        self.rng.shuffle(cells)
+        return cells
+
+    def _rollout(self, me, opp):
+        """Random game from a position with me to move: 1.0 if me wins, 0.0 if it loses, 0.5 for a draw"""
+        geometry = self.geometry
+        cell_bits = geometry.cell_bits
+        wins_through = geometry.wins_through
+        cells = list(iter_bits(geometry.full_mask & ~(me | opp)))
+        self.rng.shuffle(cells)
+        mover = 0
+        for cell in cells:
+            # Stones are always added to me; swapping keeps the mover on that side
+            me |= cell_bits[cell]
+            if wins_through(me, cell):
+                return 1.0 if mover == 0 else 0.0
+            me, opp = opp, me
+            mover ^= 1
+        return 0.5
+
+    def playout(self):
+        geometry = self.geometry
+        node = self.root
+        me, opp = self.me, self.opp
+        log = math.log
+
+        # Selection: follow UCB1 through fully expanded nodes
+        while not node.untried and node.children and node.terminal is None:
+            scale = EXPLORATION * math.sqrt(log(node.visits))
+            best, best_score = None, -1.0
+            for child in node.children:
+                score = child.wins / child.visits + scale / math.sqrt(child.visits)
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            me, opp = opp, me | geometry.cell_bits[node.move]
+
+        # Expansion and simulation
+        if node.terminal is not None:
+            result = node.terminal
+        elif node.untried:
+            cell = node.untried.pop()
+            moved = me | geometry.cell_bits[cell]
+            if geometry.wins_through(moved, cell):
+                child = Node(cell, node, [], 1.0)
+            elif not geometry.full_mask & ~(moved | opp):
+                child = Node(cell, node, [], 0.5)
+            else:
+                child = Node(cell, node, self._candidates(opp, moved))
+            node.children.append(child)
+            node = child
+            result = child.terminal if child.terminal is not None else 1.0 - self._rollout(opp, moved)
+        else:
+            result = 0.5  # no candidates left: the board is full
+
+        # Backpropagation, flipping the point of view at every level
+        while node is not None:
+            node.visits += 1
+            node.wins += result
+            result = 1.0 - result
+            node = node.parent
+        self.playouts += 1
+
+    def run(self, playouts=None, time_budget=None, cancel=None):
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        while playouts is None or self.playouts < playouts:
+            self.playout()
+            if self.playouts % CHECK_EVERY == 0:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                if cancel is not None and cancel.is_set():
+                    break
+        return self
+
+    def root_stats(self):
+        """{cell: [visits, wins]} for the root's children"""
+        return {child.move: [child.visits, child.wins] for child in self.root.children}
+
+
+def init_worker(stop):
+    global _worker_stop
+    _worker_stop = stop
+
+
+def grow_tree(task):
+    """Pool worker: build one tree and return (root stats, playouts)"""
+    size, win_length, me, opp, seed, playouts, time_budget = task
+    tree = Tree(geometry(size, win_length), me, opp, random.Random(seed))
+    tree.run(playouts, time_budget, _worker_stop)
+    return tree.root_stats(), tree.playouts
+
+
+def get_pool(workers):
+    """(pool, stop event) for workers processes"""
+    global _pool, _pool_size, _pool_stop
+    if _pool is None or _pool_size != workers:
+        shutdown()
+        context = multiprocessing.get_context("spawn")
+        _pool_stop = context.Event()
+        _pool = context.Pool(workers, initializer=init_worker, initargs=(_pool_stop,))
+        _pool_size = workers
+    return _pool, _pool_stop
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.terminate()
+        _pool = None
+
+
+def default_workers():
+    # Pool workers are daemonic and cannot start pools of their own
+    if multiprocessing.current_process().daemon:
+        return 1
+    return os.cpu_count() or 1
+
+
+def immediate_move(board, me, opp):
+    """A winning cell for me, else a cell blocking the opponent's win, else None"""
+    free = board.full_mask & ~(me | opp)
+    for bits in (me, opp):
+        for cell in iter_bits(free):
+            if board.wins_through(bits | board.cell_bits[cell], cell):
+                return cell
+    return None
+
+
+def mcts_move(state, time_budget=1.0, playouts=None, workers=None, rng=random, cancel=None):
+    """Best (row, col) for state.current_player by UCT.
+
+    Stops after time_budget seconds or playouts playouts per process,
+    whichever comes first (either may be None, not both).
+    """
+    if state.is_over:
+        return None
+    board = state.geometry
+    player = state.current_player
+    me, opp = state.bits[player], state.bits[other_player(player)]
+    cell = immediate_move(board, me, opp)
+    if cell is not None:
+        return divmod(cell, board.size)
+
+    workers = workers or default_workers()
+    start = time.perf_counter()
+    pending = None
+    if workers > 1:
+        pool, stop = get_pool(workers - 1)
+        stop.clear()
+        tasks = [(board.size, board.win_length, me, opp, rng.getrandbits(64), playouts, time_budget)
+                 for _ in range(workers - 1)]
+        pending = pool.map_async(grow_tree, tasks)
+    tree = Tree(board, me, opp, random.Random(rng.getrandbits(64))).run(playouts, time_budget, cancel)
+
+    totals = tree.root_stats()
+    total_playouts = tree.playouts
+    cancelled = cancel is not None and cancel.is_set()
+    if pending is not None and cancelled:
+        # Stop the other trees too and wait for them, so the next search starts on an idle pool
+        stop.set()
+        pending.wait()
+    elif pending is not None:
+        for stats, count in pending.get():
+            total_playouts += count
+            for move, (visits, wins) in stats.items():
+                entry = totals.setdefault(move, [0, 0.0])
+                entry[0] += visits
+                entry[1] += wins
+
+    seconds = time.perf_counter() - start
+    last_run.update(playouts=total_playouts, seconds=seconds, workers=workers)
+    metrics.count("mcts.playouts", total_playouts)
+    if not totals:
+        return None
+    best = max(totals, key=lambda move: (totals[move][0], totals[move][1]))
+    return divmod(best, board.size)
+
+
+def main(argv=None):
+    from engine import GameState, default_win_length
+
+    parser = argparse.ArgumentParser(description="Time MCTS playouts from a board position")
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--time-budget", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--moves", type=int, default=4, help="moves to play from the empty board")
+    args = parser.parse_args(argv)
+
+    state = GameState(args.size, args.win_length or default_win_length(args.size))
+    rng = random.Random(0)
+    try:
+        for _ in range(args.moves):
+            move = mcts_move(state, args.time_budget, workers=args.workers, rng=rng)
+            if move is None:
+                break
+            state.make_move(*move)
+            print(f"{move}: {last_run['playouts']} playouts in {last_run['seconds']:.2f}s "
+                  f"({last_run['playouts'] / last_run['seconds']:.0f}/s, {last_run['workers']} processes)")
+    finally:
+        shutdown()
+
+
+if __name__ == "__main__":
+    main()
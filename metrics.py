@@ -0,0 +1,287 @@
+"""Low-overhead instrumentation: latency histograms, counters and a sampler.
+
+Everything is off until enable() is called (or TICTACTOE_METRICS is set,
+see configure_from_env). While disabled, a @timed function costs one
+global flag check per call and count() returns straight away.
+
+    TICTACTOE_METRICS=metrics.json python "tic tac toe.py"
+    TICTACTOE_METRICS=metrics.json TICTACTOE_PROFILE=profile.txt python "tic tac toe.py"
+    TICTACTOE_METRICS_PORT=9108 python "tic tac toe.py"
+    python selfplay.py --games 1000 --metrics metrics.json
+    python server.py --metrics-port 9108
+
+Snapshots are plain JSON (export, or serve() for an HTTP endpoint).
+Sampler output is in collapsed-stack format, readable by flamegraph.pl
+and speedscope.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+METRICS_FILE = os.path.join(HERE, "tictactoe_metrics.json")
+
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}
+_counters = Counter()
+_sampler = None
+
+
+class Histogram:
+    """Latency histogram with power-of-two microsecond buckets"""
+
+    BUCKETS = 32  # bucket i holds durations below 2**i microseconds; the last one is open
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, in seconds"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min or 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "buckets": self.counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = list(data["buckets"])
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data["count"] else None
+        histogram.max = data["max"]
+        return histogram
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name, seconds):
+    """Add one duration to the named histogram"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += amount
+
+
+def timed(name):
+    """Decorator recording each call's duration under name while metrics are enabled"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """Current histograms and counters as a JSON-ready dict"""
+    with _lock:
+        return {
+            "time": time.time(),
+            "pid": os.getpid(),
+            "histograms": {name: histogram.to_dict() for name, histogram in sorted(_histograms.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def merge(data):
+    """Fold an exported snapshot (from another process) into this one"""
+    with _lock:
+        for name, values in data.get("histograms", {}).items():
+            incoming = Histogram.from_dict(values)
+            if name in _histograms:
+                _histograms[name].merge(incoming)
+            else:
+                _histograms[name] = incoming
+        _counters.update(data.get("counters", {}))
+
+
+def export(path=METRICS_FILE):
+    """Write a snapshot to path atomically"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot(), f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def serve(port=9108, host="127.0.0.1"):
+    """Serve snapshots as JSON on http://host:port/metrics from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = json.dumps(snapshot()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Sampler:
+    """Statistical profiler: samples one thread's stack every interval seconds"""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def export(self, path):
+        """Write collapsed stacks, one "frame;frame;frame count" line per stack"""
+        with open(path, "w") as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+
+def start_sampler(interval=0.005, thread_id=None):
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(interval, thread_id).start()
+    return _sampler
+
+
+def stop_sampler(path=None):
+    """Stop the sampler, writing its stacks to path if given"""
+    global _sampler
+    sampler, _sampler = _sampler, None
+    if sampler is not None:
+        sampler.stop()
+        if path:
+            sampler.export(path)
+    return sampler
+
+
+def configure_from_env():
+    """Enable metrics if TICTACTOE_METRICS names an output file; exported at exit.
+
+    TICTACTOE_PROFILE names a file for sampled main-thread stacks as well.
+    TICTACTOE_METRICS_PORT enables metrics and serves them on that port.
+    """
+    port = os.environ.get("TICTACTOE_METRICS_PORT")
+    if port:
+        enable()
+        serve(int(port))
+    path = os.environ.get("TICTACTOE_METRICS")
+    if not path:
+        return None
+    enable()
+    atexit.register(export, path)
+    profile_path = os.environ.get("TICTACTOE_PROFILE")
+    if profile_path:
+        start_sampler()
+        atexit.register(stop_sampler, profile_path)
+    return path
@@ -0,0 +1,87 @@
+"""Blocking network client for the Tk UI.
+
+A reader thread decodes server frames into a queue; the UI drains the queue
+from its own thread with window.after, so Tk is only touched on the main
+thread. Sends are small and go straight out on the socket.
+"""
+
+import queue
+import socket
+import threading
+
+import protocol
+
+DEFAULT_PORT = 8765
+DISCONNECTED = "disconnected"
+
+
+class NetClient:
+    def __init__(self, host, port=DEFAULT_PORT, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.events = queue.Queue()
+        self.closed = False
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def _recv_exactly(self, count):
+        data = b""
+        while len(data) < count:
+            chunk = self.sock.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            data += chunk
+        return data
+
+    def _read_loop(self):
+        try:
+            while True:
+                length = protocol.LENGTH.unpack(self._recv_exactly(protocol.LENGTH.size))[0]
+                self.events.put(protocol.decode(self._recv_exactly(length)))
+        except (OSError, ValueError):
+            self.events.put((DISCONNECTED, ()))
+
+    def send(self, opcode, *values):
+        try:
+            self.sock.sendall(protocol.encode(opcode, *values))
+        except OSError:
+            self.events.put((DISCONNECTED, ()))
+
+    def new_game(self, size, win_length, name):
+        self.send(protocol.NEW, size, win_length, protocol.pack_name(name))
+
+    def join(self, game_id, name):
+        self.send(protocol.JOIN, game_id, protocol.pack_name(name))
+
+    def queue(self, size, win_length, rating, name):
+        self.send(protocol.QUEUE, size, win_length, rating, protocol.pack_name(name))
+
+    def watch(self, game_id):
+        self.send(protocol.WATCH, game_id)
+
+    def move(self, cell):
+        self.send(protocol.MOVE, cell)
+
+    def poll(self):
+        """Return every event received so far as (opcode, values) pairs"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.sendall(protocol.encode(protocol.LEAVE))
+        except OSError:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
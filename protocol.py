@@ -0,0 +1,109 @@
+"""Binary wire protocol shared by the game server and its clients.
+
+Every frame is a 2-byte big-endian payload length followed by the payload,
+whose first byte is the opcode. Cells are sent as row * size + col.
+
+Client to server:
+    NEW    size u8, win_length u8, name 16 bytes
+                                         create a game and take seat X
+    JOIN   game_id u32, name 16 bytes    take seat O of a waiting game
+    MOVE   cell u16                      play a move in the current game
+    LEAVE                                abandon the current game or queue
+    QUEUE  size u8, win_length u8, rating u16, name 16 bytes
+                                         wait in the lobby for an opponent
+    WATCH  game_id u32                   spectate a game
+
+Server to client:
+    SEATED game_id u32, seat u8, size u8, win_length u8
+    START  game_id u32, name_x 16 bytes, name_o 16 bytes
+                                         both seats are filled
+    MOVED  cell u16, seat u8, status u8  a move was accepted
+    ERROR  code u8
+    LEFT                                 the opponent disconnected
+    QUEUED waiting u32                   players queued for this board
+    HISTORY game_id u32, record          moves so far (replay.py record), then
+                                         MOVED frames as the game goes on
+
+A matched QUEUE is answered with SEATED and START, as for NEW and JOIN.
+HISTORY is the one variable-length message: its record fills the rest of
+the frame.
+"""
+
+import struct
+
+LENGTH = struct.Struct("!H")
+
+# Opcodes
+NEW, JOIN, MOVE, LEAVE, QUEUE, WATCH = 0x01, 0x02, 0x03, 0x04, 0x05, 0x06
+SEATED, START, MOVED, ERROR, LEFT, QUEUED, HISTORY = 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87
+
+# Game status carried by MOVED
+RUNNING, X_WINS, O_WINS, DRAW = 0, 1, 2, 3
+
+# Error codes
+ERR_BAD_FRAME, ERR_NO_GAME, ERR_GAME_FULL, ERR_NOT_YOUR_TURN, ERR_ILLEGAL_MOVE, ERR_IN_GAME = 1, 2, 3, 4, 5, 6
+ERR_LOBBY_FULL = 7
+
+NAME_BYTES = 16
+
+SEATS = ("X", "O")
+
+# Payload layouts, opcode byte included
+MESSAGES = {
+    NEW: struct.Struct(f"!BBB{NAME_BYTES}s"),
+    JOIN: struct.Struct(f"!BI{NAME_BYTES}s"),
+    MOVE: struct.Struct("!BH"),
+    LEAVE: struct.Struct("!B"),
+    QUEUE: struct.Struct(f"!BBBH{NAME_BYTES}s"),
+    WATCH: struct.Struct("!BI"),
+    SEATED: struct.Struct("!BIBBB"),
+    START: struct.Struct(f"!BI{NAME_BYTES}s{NAME_BYTES}s"),
+    MOVED: struct.Struct("!BHBB"),
+    ERROR: struct.Struct("!BB"),
+    LEFT: struct.Struct("!B"),
+    QUEUED: struct.Struct("!BI"),
+    HISTORY: struct.Struct("!BI"),
+}
+
+# Messages whose last value is a bytes tail after the fixed layout
+TRAILING = {HISTORY}
+
+
+def encode(opcode, *values):
+    """Build a complete frame for opcode"""
+    if opcode in TRAILING:
+        payload = MESSAGES[opcode].pack(opcode, *values[:-1]) + values[-1]
+    else:
+        payload = MESSAGES[opcode].pack(opcode, *values)
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode(payload):
+    """Split a payload into (opcode, values); raises ValueError on a malformed frame"""
+    if not payload:
+        raise ValueError("empty frame")
+    opcode = payload[0]
+    layout = MESSAGES.get(opcode)
+    if opcode in TRAILING and layout is not None and len(payload) >= layout.size:
+        values = layout.unpack_from(payload)
+        return opcode, values[1:] + (bytes(payload[layout.size:]),)
+    if layout is None or len(payload) != layout.size:
+        raise ValueError(f"malformed frame with opcode {opcode:#x}")
+    return opcode, layout.unpack(payload)[1:]
+
+
+def pack_name(name):
+    """Fixed-width UTF-8 name field; struct pads it with NUL bytes"""
+    data = name.encode("utf-8")[:NAME_BYTES]
+    # Don't leave half a multi-byte character at the end
+    return data.decode("utf-8", "ignore").encode("utf-8")
+
+
+def unpack_name(data):
+    return data.rstrip(b"\0").decode("utf-8", "replace")
+
+
+def status_of(winner):
+    if winner is None:
+        return RUNNING
+    return {"X": X_WINS, "O": O_WINS}.get(winner, DRAW)
@@ -0,0 +1,124 @@
+"""Elo ratings for named players.
+
+Ratings are updated one game at a time as games finish (StatsDB.record
+does this in the same transaction as the insert). replay() rebuilds them
+from any stream of game records in a single pass; memory grows with the
+number of players, not the number of games.
+
+    python ratings.py                      # recompute tictactoe_stats.db
+    python ratings.py --log games.jsonl    # rate a game log, e.g. from selfplay.py --log
+"""
+
+import argparse
+import time
+
+from engine import TIE
+
+INITIAL_RATING = 1500.0
+
+# New players move faster until their rating settles
+K_FACTOR = 20.0
+PROVISIONAL_K_FACTOR = 40.0
+PROVISIONAL_GAMES = 20
+
+# Stands in for a network opponent whose name the server didn't send; never rated
+UNKNOWN_OPPONENT = "Opponent"
+
+# Bumped when the rating rules change, so stored ratings are recomputed once
+RATINGS_VERSION = "2"
+
+
+def expected_score(rating, opponent):
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / 400.0))
+
+
+def k_factor(games):
+    return PROVISIONAL_K_FACTOR if games < PROVISIONAL_GAMES else K_FACTOR
+
+
+def rate_game(x, o, result):
+    """New (rating, games) pairs for X and O after one game; result is "X", "O" or TIE"""
+    (x_rating, x_games), (o_rating, o_games) = x, o
+    score = 1.0 if result == "X" else 0.0 if result == "O" else 0.5
+    expected = expected_score(x_rating, o_rating)
+    return (
+        (x_rating + k_factor(x_games) * (score - expected), x_games + 1),
+        (o_rating + k_factor(o_games) * (expected - score), o_games + 1),
+    )
+
+
+def is_rated(player_x, player_o, result):
+    # Someone playing themselves can't change their own rating, and an unnamed opponent isn't one player
+    if UNKNOWN_OPPONENT in (player_x, player_o):
+        return False
+    return player_x != player_o and result in ("X", "O", TIE)
+
+
+class Ratings:
+    def __init__(self):
+        self.players = {}  # name -> (rating, games)
+
+    def __len__(self):
+        return len(self.players)
+
+    def get(self, name):
+        return self.players.get(name, (INITIAL_RATING, 0))
+
+    def record(self, player_x, player_o, result):
+        if not is_rated(player_x, player_o, result):
+            return
+        x, o = rate_game(self.get(player_x), self.get(player_o), result)
+        self.players[player_x] = x
+        self.players[player_o] = o
+
+    def leaderboard(self, limit=None):
+        ranked = sorted(self.players.items(), key=lambda item: item[1][0], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+
+def replay(results, ratings=None):
+    """Apply (player_x, player_o, result) tuples in order; returns the Ratings"""
+    if ratings is None:
+        ratings = Ratings()
+    record = ratings.record
+    for player_x, player_o, result in results:
+        record(player_x, player_o, result)
+    return ratings
+
+
+def log_results(path):
+    import gamelog
+
+    for game, _ in gamelog.read_records(path):
+        yield game["players"]["X"], game["players"]["O"], game["result"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute player ratings from stored games")
+    parser.add_argument("--log", default=None, metavar="PATH", help="rate a JSONL game log instead of the database")
+    parser.add_argument("--top", type=int, default=10, help="leaderboard entries to print")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.log:
+        ratings = replay(log_results(args.log))
+        games = sum(games for _, games in ratings.players.values()) // 2
+    else:
+        from statsdb import StatsDB
+
+        db = StatsDB()
+        try:
+            games = db.recompute_ratings()
+            ratings = Ratings()
+            ratings.players = {name: (rating, played) for name, rating, played in db.leaderboard()}
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Rated {games} games for {len(ratings)} players in {elapsed:.2f}s")
+    for rank, (name, (rating, played)) in enumerate(ratings.leaderboard(args.top), 1):
+        print(f"  {rank:>3}. {name:<24} {rating:7.1f}  ({played} games)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compact binary move records and seekable replays.
+
+A record is a 4-byte header (size u8, win_length u8, move count u16)
+followed by the moves as cell indices (row * size + col), bit-packed at
+the fewest bits that fit a cell: 4 bits per move on 3x3, 9 on 19x19.
+X always moves first, so players are not stored.
+
+Replay steps a single GameState back and forth with make_move/undo_move,
+so seeking anywhere in a game costs one engine call per move crossed.
+"""
+
+import struct
+
+from engine import EMPTY, GameState
+
+HEADER = struct.Struct("!BBH")
+
+
+def bits_per_move(size):
+    return max(1, (size * size - 1).bit_length())
+
+
+def encode_moves(size, win_length, cells):
+    """Pack a sequence of cell indices into a record"""
+    width = bits_per_move(size)
+    packed = 0
+    for index, cell in enumerate(cells):
+        packed |= cell << (index * width)
+    count = len(cells)
+    return HEADER.pack(size, win_length, count) + packed.to_bytes((count * width + 7) // 8, "little")
+
+
+def encode_game(state):
+    """Record for the moves played so far in a GameState"""
+    size = state.size
+    return encode_moves(size, state.win_length, [row * size + col for row, col, _ in state.moves_history])
+
+
+def decode_moves(data):
+    """Unpack a record into (size, win_length, [cell]); raises ValueError if it is malformed"""
+    if len(data) < HEADER.size:
+        raise ValueError("move record is too short")
+    size, win_length, count = HEADER.unpack_from(data)
+    width = bits_per_move(size)
+    body = data[HEADER.size:]
+    if not 3 <= win_length <= size or len(body) != (count * width + 7) // 8:
+        raise ValueError("malformed move record")
+    packed = int.from_bytes(body, "little")
+    mask = (1 << width) - 1
+    return size, win_length, [(packed >> (index * width)) & mask for index in range(count)]
+
+
+class Replay:
+    """A recorded game that can be stepped or seeked in place"""
+
+    def __init__(self, data):
+        size, win_length, cells = decode_moves(data)
+        self.state = GameState(size, win_length)
+        self.moves = [divmod(cell, size) for cell in cells]
+        self.position = 0
+        # Check the whole record once so seeking can't fail halfway
+        self.seek(len(self.moves))
+        self.seek(0)
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def at_end(self):
+        return self.position == len(self.moves)
+
+    def seek(self, position):
+        """Move to position (moves played); returns the changed cells as (row, col, player or EMPTY)"""
+        position = max(0, min(position, len(self.moves)))
+        changes = []
+        while self.position < position:
+            row, col = self.moves[self.position]
+            if not self.state.make_move(row, col):
+                raise ValueError(f"illegal move {row},{col} in record")
+            changes.append(self.state.moves_history[-1])
+            self.position += 1
+        while self.position > position:
+            row, col, _ = self.state.undo_move()
+            changes.append((row, col, EMPTY))
+            self.position -= 1
+        return changes
+
+    def step(self, count=1):
+        return self.seek(self.position + count)
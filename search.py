@@ -0,0 +1,255 @@
+"""Time-bounded game-tree search for boards too large to solve outright.
+
+Iterative deepening negamax with alpha-beta pruning, a transposition table
+and killer/history move ordering. Each completed depth leaves a best move
+behind, so when the time budget runs out search() still answers with the
+best move of the deepest finished iteration.
+
+Leaves are scored by a line evaluation kept up to date incrementally: a
+move only changes the lines through its cell, so the score is adjusted by
+looking at those lines alone instead of re-scanning the board. The
+transposition table is keyed the same way, on a Zobrist key that each move
+updates with two XORs rather than on the full bitboards.
+"""
+
+import time
+from functools import lru_cache
+
+from engine import iter_bits, other_player
+import metrics
+
+WIN = 10 ** 9
+INF = 10 ** 10
+EXACT, LOWER, UPPER = 0, 1, 2
+CHECK_EVERY = 1024  # nodes between deadline checks
+PRUNE_ABOVE = 5  # boards larger than this only search cells next to stones
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def neighbour_masks(geometry):
+    """Mask of the cells within one step of each cell"""
+    size = geometry.size
+    masks = []
+    for cell in range(geometry.cells):
+        row, col = divmod(cell, size)
+        mask = 0
+        for r in range(max(0, row - 1), min(size, row + 2)):
+            for c in range(max(0, col - 1), min(size, col + 2)):
+                mask |= geometry.cell_bits[r * size + c]
+        masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def line_weights(win_length):
+    # An open line with n stones is worth 10**n; empty lines and lines holding both colours
+    # are worth nothing, so a position scores the same for both sides with the sign flipped
+    return (0,) + tuple(10 ** n for n in range(1, win_length + 1))
+
+
+class Searcher:
+    """Iterative deepening alpha-beta search over one board geometry"""
+
+    def __init__(self, geometry, time_budget=1.0, max_depth=None, cancel=None):
+        self.geometry = geometry
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.cancel = cancel  # optional threading.Event that aborts the search
+        self.neighbours = neighbour_masks(geometry) if geometry.size > PRUNE_ABOVE else None
+        self.weights = line_weights(geometry.win_length)
+        self.table = {}
+        self.history = [0] * geometry.cells
+        self.killers = []
+        self.nodes = 0
+        self.tt_hits = 0
+        self.depth_reached = 0
+
+    def search(self, state):
+        """Best (row, col) for state.current_player found within the time budget"""
+        if state.is_over:
+            return None
+        player = state.current_player
+        me, opp = state.bits[player], state.bits[other_player(player)]
+        move = self.search_bits(me, opp, player, state.key)
+        return None if move is None else divmod(move, self.geometry.size)
+
+    def search_bits(self, me, opp, player="X", key=None):
+        """Best cell for player, who owns me; key is the position's Zobrist key if known"""
+        geometry = self.geometry
+        free = geometry.full_mask & ~(me | opp)
+        if not free:
+            return None
+        if key is None:
+            if player == "X":
+                key = geometry.position_key(me, opp, player)
+            else:
+                key = geometry.position_key(opp, me, player)
+        # Whose stone a move adds depends only on the ply's parity
+        self.move_keys = (geometry.zobrist[player], geometry.zobrist[other_player(player)])
+        self.side_key = geometry.zobrist_side
+
+        self.deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        self.tt_hits = 0
+        self.depth_reached = 0
+        self.can_stop = False
+        score = self.evaluate(me, opp)
+        max_depth = bin(free).count("1")
+        if self.max_depth is not None:
+            max_depth = min(max_depth, self.max_depth)
+
+        best_move = None
+        for depth in range(1, max_depth + 1):
+            self.killers = [[None, None] for _ in range(depth + 1)]
+            try:
+                value, move = self._root(me, opp, score, depth, best_move, key)
+            except SearchTimeout:
+                break
+            best_move = move
+            self.depth_reached = depth
+            # Depth 1 always finishes so there is a legal answer to fall back on
+            self.can_stop = True
+            if abs(value) >= WIN - max_depth:
+                break  # forced result found, deeper search cannot change it
+        return best_move
+
+    def evaluate(self, me, opp):
+        """Static line score from the point of view of the side owning me"""
+        weights = self.weights
+        score = 0
+        for mask in self.geometry.win_masks:
+            mine = bin(me & mask).count("1")
+            theirs = bin(opp & mask).count("1")
+            if not theirs:
+                score += weights[mine]
+            elif not mine:
+                score -= weights[theirs]
+        return score
+
+    def _delta(self, me, opp, cell):
+        # Score change for the side owning me when it plays cell
+        weights = self.weights
+        delta = 0
+        for mask in self.geometry.masks_through[cell]:
+            theirs = bin(opp & mask).count("1")
+            mine = bin(me & mask).count("1")
+            if not theirs:
+                delta += weights[mine + 1] - weights[mine]
+            elif not mine:
+                delta += weights[theirs]  # the opponent's line is now dead
+        return delta
+
+    def _candidates(self, me, opp):
+        occupied = me | opp
+        free = self.geometry.full_mask & ~occupied
+        if self.neighbours is None:
+            return free
+        if not occupied:
+            centre = self.geometry.size // 2
+            return self.geometry.cell_bits[centre * self.geometry.size + centre]
+        # Only cells next to existing stones are worth considering
+        near = 0
+        for cell in iter_bits(occupied):
+            near |= self.neighbours[cell]
+        return near & free or free
+
+    def _ordered_moves(self, me, opp, ply, first):
+        cells = list(iter_bits(self._candidates(me, opp)))
+        history = self.history
+        cells.sort(key=lambda cell: history[cell], reverse=True)
+        front = [first] if first is not None else []
+        if ply < len(self.killers):
+            front += [killer for killer in self.killers[ply] if killer is not None]
+        if not front:
+            return cells
+        ordered = []
+        for cell in front:
+            if cell in cells and cell not in ordered:
+                ordered.append(cell)
+        return ordered + [cell for cell in cells if cell not in ordered]
+
+    def _root(self, me, opp, score, depth, previous_best, key):
+        alpha, beta = -INF, INF
+        best_value, best_move = -INF, None
+        for cell in self._ordered_moves(me, opp, 0, previous_best):
+            value = self._child_value(me, opp, score, cell, depth, alpha, beta, 0, key)
+            if value > best_value:
+                best_value, best_move = value, cell
+            if value > alpha:
+                alpha = value
+        return best_value, best_move
+
+    def _child_value(self, me, opp, score, cell, depth, alpha, beta, ply, key):
+        # Value of playing cell for the side owning me
+        geometry = self.geometry
+        mine = me | geometry.cell_bits[cell]
+        if geometry.wins_through(mine, cell):
+            return WIN - ply
+        child_score = score + self._delta(me, opp, cell)
+        child_key = key ^ self.move_keys[ply & 1][cell] ^ self.side_key
+        return -self._negamax(opp, mine, -child_score, depth - 1, -beta, -alpha, ply + 1, child_key)
+
+    def _negamax(self, me, opp, score, depth, alpha, beta, ply, key):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and self.can_stop:
+            if time.perf_counter() > self.deadline or (self.cancel is not None and self.cancel.is_set()):
+                raise SearchTimeout()
+
+        if not self.geometry.full_mask & ~(me | opp):
+            return 0  # board full: draw
+        if depth == 0:
+            return score
+
+        entry = self.table.get(key)
+        hint = None
+        if entry is not None:
+            self.tt_hits += 1
+            entry_depth, value, flag, hint = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value > alpha:
+                    alpha = value
+                elif flag == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        best_value, best_move = -INF, None
+        for cell in self._ordered_moves(me, opp, ply, hint):
+            value = self._child_value(me, opp, score, cell, depth, alpha, beta, ply, key)
+            if value > best_value:
+                best_value, best_move = value, cell
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    # Quiet refutations are remembered for sibling positions
+                    killers = self.killers[ply] if ply < len(self.killers) else None
+                    if killers is not None and killers[0] != cell:
+                        killers[1] = killers[0]
+                        killers[0] = cell
+                    self.history[cell] += depth * depth
+                    break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, best_value, flag, best_move)
+        return best_value
+
+
+def search_move(state, time_budget=1.0, max_depth=None, cancel=None):
+    """Convenience wrapper: a fresh Searcher for one move"""
+    searcher = Searcher(state.geometry, time_budget, max_depth, cancel)
+    move = searcher.search(state)
+    metrics.count("search.nodes", searcher.nodes)
+    metrics.count("search.tt_hits", searcher.tt_hits)
+    return move
@@ -0,0 +1,191 @@
+"""Headless AI vs AI tournaments.
+
+    python selfplay.py --x easy --o hard --games 10000
+    python selfplay.py --x smart --o search --size 9 --win-length 5 --games 50 --time-budget 0.2
+
+Games are spread over a multiprocessing pool. Each game gets its own
+random.Random seeded from --seed and the game number, so a run gives the
+same results whatever the worker count or scheduling order.
+
+With --log PATH every worker appends its games to a shared game log
+(counters in PATH.counters.json), using gamelog's locked batch writes.
+With --metrics PATH, move latency histograms and search counters from all
+workers are merged into one metrics file (see metrics.py).
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from multiprocessing import Pool, util
+
+from ai import SEARCH_TIME_BUDGET, STRATEGIES, strategy_move
+from engine import GameState, TIE, default_win_length
+from gamelog import GameLog, make_record
+import metrics
+
+_log = None  # per-process GameLog when --log is given
+
+
+def open_log(log_path):
+    global _log
+    if log_path:
+        _log = GameLog(log_path, log_path + ".counters.json", batch_size=256)
+        # Pool workers exit without atexit hooks; a finalizer still flushes the last batch
+        util.Finalize(_log, _log.close, exitpriority=10)
+
+
+def init_worker(log_path, metrics_path=None):
+    open_log(log_path)
+    if metrics_path:
+        # Each worker exports its own part; the parent merges them after the pool exits
+        metrics.enable()
+        util.Finalize(None, metrics.export, args=(f"{metrics_path}.{os.getpid()}.part",), exitpriority=5)
+
+
+def merge_worker_metrics(metrics_path):
+    for part in glob.glob(glob.escape(metrics_path) + ".*.part"):
+        with open(part, "r") as f:
+            metrics.merge(json.load(f))
+        os.remove(part)
+
+
+def game_seed(seed, game_index):
+    return seed * 1_000_003 + game_index
+
+
+def play_game(task):
+    """Play one game; returns (winner, move count, {player: [move seconds]})"""
+    game_index, strategies, size, win_length, seed, time_budget = task
+    rng = random.Random(game_seed(seed, game_index))
+    state = GameState(size, win_length)
+    latencies = {"X": [], "O": []}
+    clock = time.perf_counter
+    while not state.is_over:
+        player = state.current_player
+        start = clock()
+        move = strategy_move(strategies[player], state, rng, time_budget)
+        latencies[player].append(clock() - start)
+        state.make_move(*move)
+    if _log is not None:
+        _log.record(make_record({"X": f"cpu:{strategies['X']}", "O": f"cpu:{strategies['O']}"}, "selfplay",
+                                None, size, win_length, state.moves_history, state.winner, None))
+    return state.winner, len(state.moves_history), latencies
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_tournament(x, o, games, size=3, win_length=None, workers=None, seed=0, time_budget=SEARCH_TIME_BUDGET,
+                   log_path=None, metrics_path=None):
+    """Play games between two named strategies and return a summary dict.
+
+    With metrics_path, per-function metrics from every worker are written there.
+    """
+    global _log
+    win_length = win_length or default_win_length(size)
+    strategies = {"X": x, "O": o}
+    tasks = [(i, strategies, size, win_length, seed, time_budget) for i in range(games)]
+    results = {"X": 0, "O": 0, TIE: 0}
+    latencies = {"X": [], "O": []}
+    total_moves = 0
+
+    start = time.perf_counter()
+    if metrics_path:
+        metrics.reset()
+        metrics.enable()
+    if workers == 1:
+        open_log(log_path)
+        outcomes = map(play_game, tasks)
+        pool = None
+    else:
+        pool = Pool(workers, initializer=init_worker, initargs=(log_path, metrics_path))
+        outcomes = pool.imap_unordered(play_game, tasks, chunksize=max(1, games // (8 * (workers or os.cpu_count() or 1))))
+    try:
+        for winner, moves, game_latencies in outcomes:
+            results[winner] += 1
+            total_moves += moves
+            for player in ("X", "O"):
+                latencies[player].extend(game_latencies[player])
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        elif _log is not None:
+            _log.close()
+            _log = None
+    elapsed = time.perf_counter() - start
+    if metrics_path:
+        if pool is not None:
+            merge_worker_metrics(metrics_path)
+        metrics.export(metrics_path)
+        metrics.disable()
+
+    summary = {
+        "x": x,
+        "o": o,
+        "games": games,
+        "size": size,
+        "win_length": win_length,
+        "x_wins": results["X"],
+        "o_wins": results["O"],
+        "ties": results[TIE],
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "moves_per_second": total_moves / elapsed if elapsed else 0.0,
+        "latency": {},
+    }
+    for player in ("X", "O"):
+        values = sorted(latencies[player])
+        summary["latency"][player] = {
+            "p50": percentile(values, 0.50),
+            "p90": percentile(values, 0.90),
+            "p99": percentile(values, 0.99),
+            "max": values[-1] if values else 0.0,
+        }
+    return summary
+
+
+def print_summary(summary):
+    games = summary["games"] or 1
+    print(f"{summary['x']} (X) vs {summary['o']} (O) on {summary['size']}x{summary['size']}, "
+          f"{summary['win_length']} in a row: {summary['games']} games")
+    print(f"  X wins: {summary['x_wins']} ({summary['x_wins'] / games:.1%})")
+    print(f"  O wins: {summary['o_wins']} ({summary['o_wins'] / games:.1%})")
+    print(f"  Ties:   {summary['ties']} ({summary['ties'] / games:.1%})")
+    print(f"  {summary['games_per_second']:.0f} games/s, {summary['moves_per_second']:.0f} moves/s "
+          f"in {summary['seconds']:.2f}s")
+    for player in ("X", "O"):
+        latency = summary["latency"][player]
+        print(f"  {player} move latency: p50 {latency['p50'] * 1e6:.0f}us, p90 {latency['p90'] * 1e6:.0f}us, "
+              f"p99 {latency['p99'] * 1e6:.0f}us, max {latency['max'] * 1e6:.0f}us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI strategies against each other")
+    parser.add_argument("--x", choices=sorted(STRATEGIES), default="medium", help="strategy playing X")
+    parser.add_argument("--o", choices=sorted(STRATEGIES), default="hard", help="strategy playing O")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: all cores, 1 = no pool)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget", type=float, default=SEARCH_TIME_BUDGET, help="seconds per timed search move")
+    parser.add_argument("--log", default=None, metavar="PATH", help="append every game to this game log")
+    parser.add_argument("--metrics", default=None, metavar="PATH", help="write move and search metrics to this file")
+    args = parser.parse_args(argv)
+
+    summary = run_tournament(args.x, args.o, args.games, args.size, args.win_length,
+                             args.workers, args.seed, args.time_budget, args.log, args.metrics)
+    print_summary(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
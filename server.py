@@ -0,0 +1,448 @@
+"""Asyncio TCP game server for network play.
+
+    python server.py --port 8765
+    python server.py --port 8765 --lobby-file lobby.json
+    python server.py --port 8765 --metrics-port 9108
+    python server.py --bench --games 5000 --concurrency 1000
+
+The server owns every game: moves are checked against its game state and
+only accepted moves are broadcast, so clients cannot cheat or drift out
+of sync. Game states are compact gamepool.CompactGame objects, recycled
+through a GamePool as games finish. Frames use the binary format in
+protocol.py. Players can also queue in the matchmaking lobby (lobby.py),
+which is matched in batches every MATCH_INTERVAL seconds. Spectators get
+the moves so far as one compact record, then every accepted move as it
+happens. --bench runs a loopback load test against an in-process server
+and reports games per second and move round-trip latency.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import metrics
+import protocol
+from engine import GameState, default_win_length
+from gamepool import GamePool
+from lobby import Lobby, LobbyFull
+from replay import encode_game
+
+MAX_SIZE = 19
+MAX_SPECTATORS = 64
+MATCH_INTERVAL = 0.05
+
+
+class ServerGame:
+    # Thousands are live at once: seats are two slots rather than a list, and the
+    # spectator list only exists once someone watches
+    __slots__ = ("game_id", "state", "x", "o", "spectators")
+
+    def __init__(self, game_id, state):
+        self.game_id = game_id
+        self.state = state
+        self.x = self.o = None  # sessions playing X and O
+        self.spectators = None
+
+    def player(self, seat):
+        return self.o if seat else self.x
+
+
+class Session(asyncio.Protocol):
+    """One client connection; frames are parsed straight out of data_received"""
+
+    __slots__ = ("server", "transport", "buffer", "game", "seat", "watching", "name")
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+        self.game = None
+        self.seat = None
+        self.watching = None
+        self.name = ""  # as sent with NEW, JOIN or QUEUE; empty if the client gave none
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        start = 0
+        # Handle every complete frame in the buffer, keep any partial tail
+        while len(buffer) - start >= protocol.LENGTH.size:
+            length = protocol.LENGTH.unpack_from(buffer, start)[0]
+            end = start + protocol.LENGTH.size + length
+            if end > len(buffer):
+                break
+            try:
+                opcode, values = protocol.decode(bytes(buffer[start + protocol.LENGTH.size:end]))
+            except ValueError:
+                self.send(protocol.encode(protocol.ERROR, protocol.ERR_BAD_FRAME))
+            else:
+                self.server.dispatch(self, opcode, values)
+            start = end
+        if start:
+            del buffer[:start]
+
+    def connection_lost(self, exc):
+        self.server.leave(self)
+
+    def send(self, frame):
+        # The transport buffers writes and flushes them from the event loop
+        if not self.transport.is_closing():
+            self.transport.write(frame)
+
+
+class GameServer:
+    def __init__(self, lobby=None):
+        self.games = {}
+        self.next_game_id = 1
+        self.moves_played = 0
+        self.lobby = lobby if lobby is not None else Lobby()
+        self.pool = GamePool()
+        self.matcher = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        loop = asyncio.get_running_loop()
+        self.matcher = loop.create_task(self.match_loop())
+        return await loop.create_server(lambda: Session(self), host, port, backlog=4096)
+
+    def stop(self):
+        if self.matcher is not None:
+            self.matcher.cancel()
+            self.matcher = None
+        if self.lobby.persist_path:
+            self.lobby.save()
+
+    async def match_loop(self):
+        while True:
+            await asyncio.sleep(MATCH_INTERVAL)
+            self.match_players()
+
+    def match_players(self):
+        for first, second in self.lobby.match():
+            game = self.create_game(*first.preset)
+            self.seat(first.player, game, 0)
+            self.seat(second.player, game, 1)
+            self.start_game(game)
+        self.lobby.maybe_save()
+
+    def dispatch(self, session, opcode, values):
+        if opcode == protocol.MOVE:
+            self.move(session, values[0])
+        elif opcode == protocol.NEW:
+            self.new_game(session, *values)
+        elif opcode == protocol.JOIN:
+            self.join(session, *values)
+        elif opcode == protocol.QUEUE:
+            self.queue(session, *values)
+        elif opcode == protocol.WATCH:
+            self.watch(session, values[0])
+        elif opcode == protocol.LEAVE:
+            self.leave(session)
+        else:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_BAD_FRAME))
+
+    def board_preset(self, session, size, win_length):
+        """Validated (size, win_length), or None after reporting the error"""
+        if session.game is not None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_IN_GAME))
+            return None
+        win_length = win_length or default_win_length(size)
+        if not 3 <= size <= MAX_SIZE or not 3 <= win_length <= size:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_BAD_FRAME))
+            return None
+        return size, win_length
+
+    def create_game(self, size, win_length):
+        game = ServerGame(self.next_game_id, self.pool.acquire(size, win_length))
+        self.next_game_id += 1
+        self.games[game.game_id] = game
+        return game
+
+    def new_game(self, session, size, win_length, name):
+        preset = self.board_preset(session, size, win_length)
+        if preset is None:
+            return
+        session.name = protocol.unpack_name(name)
+        self.lobby.leave(session)
+        self.seat(session, self.create_game(*preset), 0)
+
+    def queue(self, session, size, win_length, rating, name):
+        preset = self.board_preset(session, size, win_length)
+        if preset is None:
+            return
+        session.name = protocol.unpack_name(name)
+        try:
+            self.lobby.join(session, session.name or "Player", rating, preset)
+        except LobbyFull:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_LOBBY_FULL))
+            return
+        self.stop_watching(session)
+        session.send(protocol.encode(protocol.QUEUED, self.lobby.waiting(preset)))
+
+    def join(self, session, game_id, name):
+        if session.game is not None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_IN_GAME))
+            return
+        game = self.games.get(game_id)
+        if game is None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_NO_GAME))
+            return
+        if game.o is not None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_GAME_FULL))
+            return
+        session.name = protocol.unpack_name(name)
+        self.lobby.leave(session)
+        self.seat(session, game, 1)
+        self.start_game(game)
+
+    def watch(self, session, game_id):
+        if session.game is not None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_IN_GAME))
+            return
+        game = self.games.get(game_id)
+        if game is None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_NO_GAME))
+            return
+        if game.spectators is not None and len(game.spectators) >= MAX_SPECTATORS:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_GAME_FULL))
+            return
+        # A session is in at most one of: the lobby, a game's spectators, a seat
+        self.lobby.leave(session)
+        self.stop_watching(session)
+        if game.spectators is None:
+            game.spectators = []
+        game.spectators.append(session)
+        session.watching = game
+        session.send(protocol.encode(protocol.HISTORY, game.game_id, encode_game(game.state)))
+
+    def stop_watching(self, session):
+        if session.watching is not None:
+            session.watching.spectators.remove(session)
+            session.watching = None
+
+    def start_game(self, game):
+        # Each side learns who it plays, so both record the game under real names
+        start = protocol.encode(protocol.START, game.game_id,
+                                protocol.pack_name(game.x.name), protocol.pack_name(game.o.name))
+        metrics.count("server.games")
+        game.x.send(start)
+        game.o.send(start)
+
+    def seat(self, session, game, seat):
+        self.stop_watching(session)
+        if seat:
+            game.o = session
+        else:
+            game.x = session
+        session.game = game
+        session.seat = seat
+        session.send(protocol.encode(protocol.SEATED, game.game_id, seat, game.state.size, game.state.win_length))
+
+    def move(self, session, cell):
+        game = session.game
+        if game is None or game.x is None or game.o is None:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_NO_GAME))
+            return
+        state = game.state
+        if state.current_player != protocol.SEATS[session.seat] or state.is_over:
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_NOT_YOUR_TURN))
+            return
+        row, col = divmod(cell, state.size)
+        if cell >= state.size * state.size or not state.make_move(row, col):
+            session.send(protocol.encode(protocol.ERROR, protocol.ERR_ILLEGAL_MOVE))
+            return
+
+        self.moves_played += 1
+        metrics.count("server.moves")
+        moved = protocol.encode(protocol.MOVED, cell, session.seat, protocol.status_of(state.winner))
+        game.x.send(moved)
+        game.o.send(moved)
+        for spectator in game.spectators or ():
+            spectator.send(moved)
+        if state.is_over:
+            self.close_game(game)
+
+    def leave(self, session):
+        self.lobby.leave(session)
+        self.stop_watching(session)
+        game = session.game
+        if game is None:
+            return
+        if not game.state.is_over:
+            left = protocol.encode(protocol.LEFT)
+            opponent = game.player(1 - session.seat)
+            if opponent is not None:
+                opponent.send(left)
+            for spectator in game.spectators or ():
+                spectator.send(left)
+        self.close_game(game)
+
+    def close_game(self, game):
+        if self.games.pop(game.game_id, None) is not game:
+            return
+        for player in (game.x, game.o):
+            if player is not None:
+                player.game = None
+                player.seat = None
+        for spectator in game.spectators or ():
+            spectator.watching = None
+        game.spectators = None
+        # Nothing refers to the state any more; the next game on this board reuses it
+        self.pool.release(game.state)
+        game.state = None
+
+
+class Connection:
+    """Minimal asyncio client, used by the load test"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    def send(self, opcode, *values):
+        self.writer.write(protocol.encode(opcode, *values))
+
+    async def receive(self):
+        header = await self.reader.readexactly(protocol.LENGTH.size)
+        return protocol.decode(await self.reader.readexactly(protocol.LENGTH.unpack(header)[0]))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _bench_player(conn, seat, state, rng, latencies):
+    # Both players read every MOVED; the side to move picks a random legal cell
+    seat_name = protocol.SEATS[seat]
+    while True:
+        if state.current_player == seat_name:
+            row, col = rng.choice(state.legal_moves())
+            sent = time.perf_counter()
+            conn.send(protocol.MOVE, row * state.size + col)
+        else:
+            sent = None
+        opcode, values = await conn.receive()
+        if opcode != protocol.MOVED:
+            raise RuntimeError(f"unexpected reply {opcode:#x} {values}")
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+        cell, _, status = values
+        state.make_move(*divmod(cell, state.size))
+        if status != protocol.RUNNING:
+            return status
+
+
+async def _bench_table(host, port, games, size, win_length, rng, latencies):
+    # One pair of connections plays its share of games back to back, like a real table
+    host_conn = await Connection.open(host, port)
+    guest_conn = await Connection.open(host, port)
+    try:
+        for _ in range(games):
+            host_conn.send(protocol.NEW, size, win_length, b"host")
+            _, (game_id, _, _, _) = await host_conn.receive()
+            guest_conn.send(protocol.JOIN, game_id, b"guest")
+            await guest_conn.receive()  # SEATED
+            for conn in (host_conn, guest_conn):
+                opcode, _ = await conn.receive()
+                if opcode != protocol.START:
+                    raise RuntimeError("game did not start")
+            await asyncio.gather(
+                _bench_player(host_conn, 0, GameState(size, win_length), rng, latencies),
+                _bench_player(guest_conn, 1, GameState(size, win_length), rng, latencies),
+            )
+    finally:
+        await host_conn.close()
+        await guest_conn.close()
+
+
+async def run_bench(games=2000, concurrency=500, size=3, win_length=3, seed=0):
+    """Play random games through a loopback server; returns a summary dict"""
+    server = GameServer()
+    listener = await server.start("127.0.0.1", 0)
+    host, port = listener.sockets[0].getsockname()[:2]
+    rng = random.Random(seed)
+    latencies = []
+    # Each simultaneous game holds four sockets (two client, two server side)
+    soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0] if resource else None
+    if soft_limit and soft_limit != resource.RLIM_INFINITY and concurrency * 4 + 64 > soft_limit:
+        concurrency = (soft_limit - 64) // 4
+        print(f"Open file limit is {soft_limit}; running {concurrency} games at a time")
+    concurrency = max(1, min(concurrency, games))
+    shares = [games // concurrency + (i < games % concurrency) for i in range(concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_bench_table(host, port, share, size, win_length, rng, latencies) for share in shares))
+    elapsed = time.perf_counter() - start
+    server.stop()
+    listener.close()
+    await listener.wait_closed()
+
+    latencies.sort()
+    pick = lambda fraction: latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+    return {
+        "games": games,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed,
+        "moves_per_second": server.moves_played / elapsed,
+        "states_created": server.pool.created,
+        "states_reused": server.pool.reused,
+        "p50": pick(0.50),
+        "p99": pick(0.99),
+    }
+
+
+async def serve(host, port, lobby_file=None):
+    server = GameServer(Lobby(persist_path=lobby_file))
+    listener = await server.start(host, port)
+    print(f"Serving on {host}:{port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tic-tac-toe network game server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--lobby-file", default=None, help="keep a snapshot of the matchmaking queue here")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve move and game counters as JSON on this local port (see metrics.py)")
+    parser.add_argument("--bench", action="store_true", help="run the loopback load test instead of serving")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500, help="simultaneous games (connection pairs) in --bench")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.metrics_port:
+        metrics.enable()
+        metrics.serve(args.metrics_port)  # local only, whatever --host says
+    if not args.bench:
+        asyncio.run(serve(args.host, args.port, args.lobby_file))
+        return
+
+    win_length = args.win_length or default_win_length(args.size)
+    result = asyncio.run(run_bench(args.games, args.concurrency, args.size, win_length))
+    print(f"{result['games']} games, {result['concurrency']} concurrent: "
+          f"{result['games_per_second']:.0f} games/s, {result['moves_per_second']:.0f} moves/s")
+    print(f"  move round trip: p50 {result['p50'] * 1e3:.2f}ms, p99 {result['p99'] * 1e3:.2f}ms")
+    print(f"  game states: {result['states_created']} allocated, {result['states_reused']} reused from the pool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Perfect-play tic-tac-toe solver.
+
+Negamax with alpha-beta pruning over the engine's bitboards. Every searched
+position is kept in a transposition table keyed on the symmetry-canonical
+(mover bits, opponent bits), so after the first search a CPU reply is a
+dictionary lookup and the 8 rotations/mirrors of a position share one entry.
+
+Scores are from the side to move: 0 is a draw, a win scores 1 plus the
+number of cells left empty after the winning move (so faster wins score
+higher) and a loss is the negation of that.
+"""
+
+from engine import CELL_BITS, FULL_MASK, is_win, iter_bits, other_player
+from symmetry import canonical, restore_cell, transform_cell
+
+EXACT, LOWER, UPPER = 0, 1, 2
+INF = 100
+
+# Center first, then corners, then edges: good lines are found early and cut more
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# canonical (mover bits, opponent bits) -> (score, canonical best cell, bound flag)
+_table = {}
+
+
+def negamax(me, opp, alpha=-INF, beta=INF):
+    """Return (score, best cell index) for the side owning me, to move"""
+    canon_me, canon_opp, t = canonical(me, opp)
+    key = (canon_me, canon_opp)
+    entry = _table.get(key)
+    hint = None
+    if entry is not None:
+        score, move, flag = entry
+        if move is not None:
+            move = restore_cell(move, t)
+        if flag == EXACT:
+            return score, move
+        if flag == LOWER and score > alpha:
+            alpha = score
+        elif flag == UPPER and score < beta:
+            beta = score
+        if alpha >= beta:
+            return score, move
+        hint = move
+
+    free = FULL_MASK & ~(me | opp)
+    if not free:
+        return 0, None
+
+    remaining = bin(free).count("1")
+    original_alpha = alpha
+    best_score, best_move = -INF, None
+    order = MOVE_ORDER if hint is None else (hint,) + MOVE_ORDER
+    for i in order:
+        bit = CELL_BITS[i]
+        if not free & bit:
+            continue
+        free &= ~bit  # also keeps the hint from being searched twice
+        mine = me | bit
+        if is_win(mine):
+            score = remaining
+        else:
+            score = -negamax(opp, mine, -beta, -alpha)[0]
+        if score > best_score:
+            best_score, best_move = score, i
+        if score > alpha:
+            alpha = score
+            if alpha >= beta:
+                break
+
+    if best_score <= original_alpha:
+        flag = UPPER
+    elif best_score >= beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    _table[key] = (best_score, transform_cell(best_move, t), flag)
+    return best_score, best_move
+
+
+def _split(state):
+    player = state.current_player
+    return state.bits[player], state.bits[other_player(player)]
+
+
+def solve(state):
+    """Exact score of the position for state.current_player"""
+    if state.is_over:
+        return 0
+    return negamax(*_split(state))[0]
+
+
+def best_move(state):
+    """An optimal (row, col) for state.current_player, or None if the game is over"""
+    if state.is_over:
+        return None
+    move = negamax(*_split(state))[1]
+    return None if move is None else divmod(move, 3)
+
+
+def best_moves(me, opp):
+    """Exact score and every optimal cell index for the side owning me"""
+    free = FULL_MASK & ~(me | opp)
+    if not free:
+        return 0, []
+    remaining = bin(free).count("1")
+    scores = {}
+    for i in iter_bits(free):
+        mine = me | CELL_BITS[i]
+        scores[i] = remaining if is_win(mine) else -negamax(opp, mine)[0]
+    best = max(scores.values())
+    return best, [i for i, score in scores.items() if score == best]
+
+
+def clear_cache():
+    _table.clear()
@@ -0,0 +1,75 @@
+"""Cold-start benchmark for the Tk game.
+
+    python startup.py --runs 10
+    python startup.py --runs 10 --budget 0.5
+
+Each run launches "tic tac toe.py" in a fresh interpreter with
+TICTACTOE_STARTUP_PROBE set. The game prints the time from the start of
+its script to the first painted main menu frame, then quits. This reports
+that time and the whole wall time including interpreter startup. The exit
+status is 1 when the median wall time is over --budget. A display is
+required.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAME = os.path.join(HERE, "tic tac toe.py")
+
+# Launch to first painted frame, interpreter startup included
+COLD_START_BUDGET = 0.5
+
+
+def measure_once(timeout=30):
+    """Return (wall seconds to first frame, in-script seconds to first frame)"""
+    env = dict(os.environ, TICTACTOE_STARTUP_PROBE="1")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, GAME], env=env, cwd=HERE, capture_output=True, text=True,
+                            timeout=timeout)
+    wall = time.perf_counter() - start
+    for line in result.stdout.splitlines():
+        if line.startswith("first-frame "):
+            # The process exits right after painting, so its end is a close bound on the frame time
+            return wall, float(line.split()[1])
+    raise RuntimeError(f"game did not report a first frame:\n{result.stderr.strip()}")
+
+
+def run_bench(runs=10):
+    """Measure runs cold starts; returns a summary dict"""
+    walls, scripts = [], []
+    for _ in range(runs):
+        wall, script = measure_once()
+        walls.append(wall)
+        scripts.append(script)
+    return {
+        "runs": runs,
+        "wall_median": statistics.median(walls),
+        "wall_max": max(walls),
+        "script_median": statistics.median(scripts),
+        "script_max": max(scripts),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time to the game's first painted frame")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=COLD_START_BUDGET, help="seconds allowed (median wall time)")
+    args = parser.parse_args(argv)
+
+    result = run_bench(args.runs)
+    print(f"{result['runs']} cold starts to first frame:")
+    print(f"  wall (with interpreter startup): median {result['wall_median'] * 1e3:.0f}ms, "
+          f"max {result['wall_max'] * 1e3:.0f}ms")
+    print(f"  in script: median {result['script_median'] * 1e3:.0f}ms, max {result['script_max'] * 1e3:.0f}ms")
+    over = result["wall_median"] > args.budget
+    print(f"  budget {args.budget * 1e3:.0f}ms: {'OVER' if over else 'ok'}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""SQLite-backed game statistics and history.
+
+Games live in one indexed table so statistics can be sliced by player,
+difficulty, game mode and date range without reading the whole history.
+Running totals per difficulty and mode, overall and per player, are kept
+in the same transaction as each insert, so the usual statistics screen
+reads a few rows; only date ranges query the games table. The database
+runs in WAL mode with a busy timeout, so several game processes can write
+while others read: each game and its totals and ratings are one
+transaction, and a writer waits for the lock instead of failing.
+
+On first use the older files are migrated once: every game in
+tictactoe_games.jsonl is imported, and counts in tictactoe_stats.json
+that predate the log are kept as a legacy base total.
+
+Player ratings (ratings.py) are kept in their own table and updated with
+every recorded game; recompute_ratings() rebuilds them from the history.
+"""
+
+import json
+import os
+import sqlite3
+import warnings
+
+import gamelog
+import metrics
+import ratings
+import replay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(HERE, "tictactoe_stats.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT,
+    ended_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    difficulty TEXT,
+    size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    player_x TEXT NOT NULL,
+    player_o TEXT NOT NULL,
+    first TEXT NOT NULL,
+    result TEXT NOT NULL,
+    moves TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_ended_at ON games (ended_at);
+CREATE INDEX IF NOT EXISTS games_mode_difficulty ON games (mode, difficulty, ended_at);
+CREATE INDEX IF NOT EXISTS games_player_x ON games (player_x, ended_at);
+CREATE INDEX IF NOT EXISTS games_player_o ON games (player_o, ended_at);
+CREATE TABLE IF NOT EXISTS ratings (
+    player TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    difficulty TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    games_played INTEGER NOT NULL,
+    player_wins INTEGER NOT NULL,
+    cpu_wins INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, mode)
+);
+CREATE TABLE IF NOT EXISTS player_totals (
+    player TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    PRIMARY KEY (player, difficulty, mode)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+INSERT_GAME = """
+INSERT INTO games (started_at, ended_at, mode, difficulty, size, win_length,
+                   player_x, player_o, first, result, moves)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Totals rows use ANY for "every difficulty" or "every mode", and '' for games without a difficulty
+ANY = "*"
+
+UPDATE_TOTALS = """
+INSERT INTO totals VALUES (?, ?, 1, ?, ?, ?)
+ON CONFLICT (difficulty, mode) DO UPDATE SET
+    games_played = games_played + 1,
+    player_wins = player_wins + excluded.player_wins,
+    cpu_wins = cpu_wins + excluded.cpu_wins,
+    ties = ties + excluded.ties
+"""
+
+UPDATE_PLAYER_TOTALS = """
+INSERT INTO player_totals VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (player, difficulty, mode) DO UPDATE SET
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    ties = ties + excluded.ties
+"""
+
+# Same rules as gamelog.count_game, as SQL aggregates
+COUNTERS_SELECT = """
+SELECT COUNT(*),
+       COALESCE(SUM(result = 'X' OR (result = 'O' AND mode != 'single')), 0),
+       COALESCE(SUM(result = 'O' AND mode = 'single'), 0),
+       COALESCE(SUM(result = 'tie'), 0)
+FROM games
+"""
+
+PLAYER_SELECT = """
+SELECT COALESCE(SUM((player_x = :name AND result = 'X') OR (player_o = :name AND result = 'O')), 0),
+       COALESCE(SUM((player_x = :name AND result = 'O') OR (player_o = :name AND result = 'X')), 0),
+       COALESCE(SUM(result = 'tie'), 0)
+FROM (
+    SELECT player_x, player_o, result FROM games WHERE player_x = :name {filters}
+    UNION ALL
+    SELECT player_x, player_o, result FROM games WHERE player_o = :name AND player_x != :name {filters}
+)
+"""
+
+
+def _filters(difficulty=None, mode=None, since=None, until=None):
+    # Fixed clause text keeps each filter combination a single cached statement
+    clauses, params = [], {}
+    if difficulty is not None:
+        clauses.append("difficulty = :difficulty")
+        params["difficulty"] = difficulty
+    if mode is not None:
+        clauses.append("mode = :mode")
+        params["mode"] = mode
+    if since is not None:
+        clauses.append("ended_at >= :since")
+        params["since"] = since
+    if until is not None:
+        clauses.append("ended_at < :until")
+        params["until"] = until
+    return clauses, params
+
+
+def _scopes(difficulty, mode):
+    """The four totals rows a game with this difficulty and mode counts towards"""
+    difficulty = difficulty or ""
+    return ((ANY, ANY), (difficulty, ANY), (ANY, mode), (difficulty, mode))
+
+
+def _player_results(player_x, player_o, result):
+    """{name: (wins, losses, ties)} for one game, with PLAYER_SELECT's rules"""
+    if player_x == player_o:
+        # Both seats count once: a decided game is a win and a loss
+        return {player_x: (0, 0, 1) if result == "tie" else (1, 1, 0)}
+    if result == "tie":
+        return {player_x: (0, 0, 1), player_o: (0, 0, 1)}
+    winner, loser = (player_x, player_o) if result == "X" else (player_o, player_x)
+    return {winner: (1, 0, 0), loser: (0, 1, 0)}
+
+
+class StatsDB:
+    def __init__(self, path=DB_FILE, log_path=gamelog.LOG_FILE, counters_path=gamelog.COUNTERS_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=10)  # busy timeout, in seconds
+        # SQLite keeps the old journal where WAL is unsupported (some network drives); still safe, but
+        # readers then block writers
+        journal_mode = self.conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            warnings.warn(f"{path} is not in WAL mode ({journal_mode}); statistics reads will block game writes",
+                          RuntimeWarning)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.migrate(log_path, counters_path)
+        if not self._meta("totals"):
+            self.rebuild_totals()
+        if self._meta("ratings_version") != ratings.RATINGS_VERSION:
+            self.recompute_ratings()
+
+    def _meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def migrate(self, log_path, counters_path):
+        """Import the JSON log and counters once; later calls do nothing"""
+        with self.conn:
+            # BEGIN IMMEDIATE so two processes starting together don't both import
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._meta("migrated"):
+                return
+            logged = gamelog.empty_counters()
+            for game, _ in gamelog.read_records(log_path):
+                gamelog.count_game(logged, game)
+                self._insert(game)
+
+            try:
+                with open(counters_path, "r") as f:
+                    snapshot = json.load(f)
+                totals = {key: int(snapshot.get(key, 0)) for key in gamelog.COUNTER_KEYS}
+            except FileNotFoundError:
+                totals = gamelog.empty_counters()
+            except (OSError, ValueError, TypeError, AttributeError):
+                warnings.warn(f"{counters_path} is unreadable; counts from before the game log are not imported",
+                              RuntimeWarning)
+                totals = gamelog.empty_counters()
+            # Whatever the JSON counted beyond the logged games has no history left
+            base = {key: max(0, totals[key] - logged[key]) for key in gamelog.COUNTER_KEYS}
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('legacy_counters', ?)", (json.dumps(base),))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated', '1')")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('totals', '1')")
+
+    def rebuild_totals(self):
+        """Recount the totals tables from the games table (databases from before they existed)"""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._meta("totals"):
+                return
+            self.conn.execute("DELETE FROM totals")
+            self.conn.execute("DELETE FROM player_totals")
+            rows = self.conn.execute("SELECT mode, difficulty, player_x, player_o, result FROM games ORDER BY id")
+            for mode, difficulty, player_x, player_o, result in rows.fetchall():
+                self._count(mode, difficulty, player_x, player_o, result)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('totals', '1')")
+
+    def _insert(self, game):
+        self.conn.execute(INSERT_GAME, (
+            game.get("started_at"),
+            game["ended_at"],
+            game["mode"],
+            game.get("difficulty"),
+            game.get("size", 3),
+            game.get("win_length", 3),
+            game["players"]["X"],
+            game["players"]["O"],
+            game.get("first", "X"),
+            game["result"],
+            json.dumps(game["moves"], separators=(",", ":")),
+        ))
+        self._count(game["mode"], game.get("difficulty"), game["players"]["X"], game["players"]["O"],
+                    game["result"])
+
+    def _count(self, mode, difficulty, player_x, player_o, result):
+        # Caller holds the transaction the game itself is inserted in
+        counts = gamelog.empty_counters()
+        gamelog.count_game(counts, {"mode": mode, "result": result})
+        scopes = _scopes(difficulty, mode)
+        self.conn.executemany(UPDATE_TOTALS, (
+            (difficulty, mode, counts["player_wins"], counts["cpu_wins"], counts["ties"])
+            for difficulty, mode in scopes))
+        self.conn.executemany(UPDATE_PLAYER_TOTALS, (
+            (name, difficulty, mode, *record)
+            for name, record in _player_results(player_x, player_o, result).items()
+            for difficulty, mode in scopes))
+
+    @metrics.timed("stats.record")
+    def record(self, game):
+        """Store one finished game (a gamelog.make_record dict) and update ratings"""
+        with self.conn:
+            self._insert(game)
+            self._rate(game["players"]["X"], game["players"]["O"], game["result"])
+        metrics.count("stats.writes")
+
+    def _rate(self, player_x, player_o, result):
+        if not ratings.is_rated(player_x, player_o, result):
+            return
+        x, o = ratings.rate_game(self.rating(player_x), self.rating(player_o), result)
+        self.conn.executemany("INSERT OR REPLACE INTO ratings VALUES (?, ?, ?)",
+                              ((player_x, *x), (player_o, *o)))
+
+    def rating(self, name):
+        """(rating, games rated) for name; new players start at ratings.INITIAL_RATING"""
+        row = self.conn.execute("SELECT rating, games FROM ratings WHERE player = ?", (name,)).fetchone()
+        return row if row else (ratings.INITIAL_RATING, 0)
+
+    def leaderboard(self, limit=-1):
+        """(name, rating, games) rows, best first"""
+        rows = self.conn.execute("SELECT player, rating, games FROM ratings ORDER BY rating DESC LIMIT ?", (limit,))
+        return rows.fetchall()
+
+    def recompute_ratings(self):
+        """Rebuild every rating from the stored games in one streaming pass; returns the game count"""
+        with self.conn:
+            # Hold the write lock so no game is recorded between the replay and the rewrite
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute("SELECT player_x, player_o, result FROM games ORDER BY id")
+            rated = ratings.replay(rows)
+            self.conn.execute("DELETE FROM ratings")
+            self.conn.executemany("INSERT INTO ratings VALUES (?, ?, ?)",
+                                  ((name, rating, games) for name, (rating, games) in rated.players.items()))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('ratings_version', ?)", (ratings.RATINGS_VERSION,))
+            return self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def counters(self, difficulty=None, mode=None, since=None, until=None):
+        """games_played/player_wins/cpu_wins/ties, optionally filtered; dates are ISO strings"""
+        clauses, params = _filters(difficulty, mode, since, until)
+        if since is None and until is None:
+            row = self.conn.execute(
+                "SELECT games_played, player_wins, cpu_wins, ties FROM totals WHERE difficulty = ? AND mode = ?",
+                (ANY if difficulty is None else difficulty, ANY if mode is None else mode)).fetchone()
+        else:
+            row = self.conn.execute(COUNTERS_SELECT + " WHERE " + " AND ".join(clauses), params).fetchone()
+        counters = dict(zip(gamelog.COUNTER_KEYS, row or (0, 0, 0, 0)))
+        if not clauses:
+            # Pre-history totals can only be reported unfiltered
+            legacy = json.loads(self._meta("legacy_counters", "{}"))
+            for key in gamelog.COUNTER_KEYS:
+                counters[key] += legacy.get(key, 0)
+        return counters
+
+    def player_record(self, name, difficulty=None, mode=None, since=None, until=None):
+        """(wins, losses, ties) for games where name played either side"""
+        if since is None and until is None:
+            row = self.conn.execute(
+                "SELECT wins, losses, ties FROM player_totals WHERE player = ? AND difficulty = ? AND mode = ?",
+                (name, ANY if difficulty is None else difficulty, ANY if mode is None else mode)).fetchone()
+            return tuple(row) if row else (0, 0, 0)
+        clauses, params = _filters(difficulty, mode, since, until)
+        filters = "".join(" AND " + clause for clause in clauses)
+        params["name"] = name
+        return tuple(self.conn.execute(PLAYER_SELECT.format(filters=filters), params).fetchone())
+
+    def player_names(self):
+        rows = self.conn.execute("SELECT player FROM player_totals WHERE difficulty = ? AND mode = ? ORDER BY 1",
+                                 (ANY, ANY))
+        return [row[0] for row in rows]
+
+    def games(self, since=None):
+        """Stream games oldest first, in the gamelog record format"""
+        clauses, params = _filters(since=since)
+        sql = ("SELECT started_at, ended_at, mode, difficulty, size, win_length, player_x, player_o,"
+               " first, result, moves FROM games"
+               + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY id")
+        for row in self.conn.execute(sql, params):
+            yield {
+                "players": {"X": row[6], "O": row[7]},
+                "mode": row[2],
+                "difficulty": row[3],
+                "size": row[4],
+                "win_length": row[5],
+                "moves": json.loads(row[10]),
+                "first": row[8],
+                "result": row[9],
+                "started_at": row[0],
+                "ended_at": row[1],
+            }
+
+    def recent_games(self, limit=50):
+        """(id, ended_at, player_x, player_o, result) rows, newest first"""
+        rows = self.conn.execute("SELECT id, ended_at, player_x, player_o, result FROM games"
+                                 " ORDER BY id DESC LIMIT ?", (limit,))
+        return rows.fetchall()
+
+    def replay_record(self, game_id):
+        """The stored game as a compact replay.py record, or None"""
+        row = self.conn.execute("SELECT size, win_length, moves FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row is None:
+            return None
+        size, win_length, moves = row
+        return replay.encode_moves(size, win_length, [r * size + c for r, c in json.loads(moves)])
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,71 @@
+"""Board symmetries (the D4 group: 4 rotations, each optionally mirrored).
+
+canonical() maps a position to the smallest of its 8 symmetric images plus
+the transform that produced it, so caches and tables store one entry per
+equivalence class. Cell indexes are row * 3 + col, as in engine.py.
+"""
+
+from engine import iter_bits
+
+
+def _rotate(cell):
+    row, col = divmod(cell, 3)
+    return col * 3 + (2 - row)
+
+
+def _mirror(cell):
+    row, col = divmod(cell, 3)
+    return row * 3 + (2 - col)
+
+
+def _build_perms():
+    perms = []
+    perm = list(range(9))
+    for _ in range(4):
+        perms.append(tuple(perm))
+        perms.append(tuple(_mirror(cell) for cell in perm))
+        perm = [_rotate(cell) for cell in perm]
+    return tuple(perms)
+
+
+# PERMS[t][cell] is where transform t sends cell; INVERSE[t] undoes it
+PERMS = _build_perms()
+INVERSE = tuple(tuple(perm.index(cell) for cell in range(9)) for perm in PERMS)
+IDENTITY = 0
+
+# MASK_TABLES[t][mask] is the 9-bit mask with every cell moved by transform t
+MASK_TABLES = tuple(
+    tuple(sum(1 << perm[i] for i in iter_bits(mask)) for mask in range(1 << 9))
+    for perm in PERMS
+)
+
+# Cells grouped by symmetry class: center, corners, edges
+CELL_ORBITS = tuple(
+    sorted({perm[cell] for perm in PERMS})
+    for cell in (4, 0, 1)
+)
+
+
+def transform_bits(mask, t):
+    return MASK_TABLES[t][mask]
+
+
+def transform_cell(cell, t):
+    return PERMS[t][cell]
+
+
+def restore_cell(cell, t):
+    """Map a cell of the canonical board back to the original board"""
+    return INVERSE[t][cell]
+
+
+def canonical(first, second):
+    """Return (first', second', t): the smallest symmetric image of the pair and its transform"""
+    best_first, best_second, best_t = first, second, IDENTITY
+    for t in range(1, 8):
+        table = MASK_TABLES[t]
+        image = (table[first], table[second])
+        if image < (best_first, best_second):
+            best_first, best_second = image
+            best_t = t
+    return best_first, best_second, best_t
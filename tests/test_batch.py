@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from engine import GameState
+
+np = pytest.importorskip("numpy")
+import batch  # noqa: E402
+
+
+def random_games(size, win_length, count, seed=0):
+    """Finished and unfinished positions from random play"""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        state = GameState(size, win_length)
+        for _ in range(rng.randrange(size * size + 1)):
+            if state.is_over:
+                break
+            state.make_move(*rng.choice(state.legal_moves()))
+        games.append(state)
+    return games
+
+
+def expected(state):
+    return {"X": batch.X_WINS, "O": batch.O_WINS}.get(state.winner, batch.NO_WINNER)
+
+
+def grid(state):
+    cells = np.zeros((state.size, state.size), dtype=np.int8)
+    for row, col, player in state.moves_history:
+        cells[row, col] = batch.X_WINS if player == "X" else batch.O_WINS
+    return cells
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (4, 4), (5, 4), (7, 5)])
+def test_batch_status_matches_the_engine(size, win_length):
+    games = random_games(size, win_length, 300, seed=size)
+    board = games[0].geometry
+    x_bits = [state.bits["X"] for state in games]
+    o_bits = [state.bits["O"] for state in games]
+    winners, full, legal = batch.batch_status(x_bits, o_bits, board)
+    for index, state in enumerate(games):
+        assert winners[index] == expected(state)
+        assert full[index] == state.is_board_full()
+        assert int(legal[index]) == board.full_mask & ~(state.bits["X"] | state.bits["O"])
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (7, 5), (9, 5)])
+def test_grid_status_matches_the_engine(size, win_length):
+    games = random_games(size, win_length, 100, seed=size)
+    boards = np.stack([grid(state) for state in games])
+    winners, full, legal = batch.grid_status(boards, win_length)
+    for index, state in enumerate(games):
+        assert winners[index] == expected(state)
+        assert full[index] == state.is_board_full()
+        assert legal[index].sum() == size * size - len(state.moves_history)
+
+
+def test_pack_grids_round_trips():
+    games = random_games(3, 3, 50)
+    x_bits, o_bits = batch.pack_grids(np.stack([grid(state) for state in games]))
+    assert [int(bits) for bits in x_bits] == [state.bits["X"] for state in games]
+    assert [int(bits) for bits in o_bits] == [state.bits["O"] for state in games]
@@ -0,0 +1,44 @@
+import pytest
+
+from engine import CELL_BITS, is_win
+from book import OpeningBook, build, pack_entry, reachable_positions, unpack_entry
+from test_solver import minimax
+
+
+def to_move(x_bits, o_bits):
+    if bin(x_bits).count("1") == bin(o_bits).count("1"):
+        return x_bits, o_bits
+    return o_bits, x_bits
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    # Built fresh, so a stale tictactoe_book.bin can't hide a solver change
+    path = str(tmp_path_factory.mktemp("book") / "book.bin")
+    build(path)
+    table = OpeningBook(path)
+    yield table
+    table.close()
+
+
+def test_entries_round_trip():
+    assert unpack_entry(pack_entry(-7, [0, 4, 8])) == (-7, [0, 4, 8])
+    assert unpack_entry(0) is None
+
+
+def test_book_agrees_with_minimax(book):
+    for x_bits, o_bits in reachable_positions():
+        me, opp = to_move(x_bits, o_bits)
+        expected = minimax(me, opp)
+        score, moves = book.lookup(x_bits, o_bits)
+        assert score == expected and moves
+        for cell in moves:
+            assert is_win(me | CELL_BITS[cell]) or -minimax(opp, me | CELL_BITS[cell]) == expected
+
+
+def test_shipped_book_matches_a_fresh_build(book):
+    shipped = OpeningBook()
+    try:
+        assert shipped.data[:] == book.data[:]
+    finally:
+        shipped.close()
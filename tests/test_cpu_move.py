@@ -0,0 +1,54 @@
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from ai import choose_move
+from engine import GameState
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_ui():
+    spec = importlib.util.spec_from_file_location("tictactoe_ui", os.path.join(HERE, "tic tac toe.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.TicTacToe
+
+
+def fake_game(TicTacToe):
+    # Just the attributes the CPU move methods use, with no window behind them
+    game = SimpleNamespace(search_token=0, search_cancel=None, game_active=True, difficulty="Hard", played=[])
+    game.window = SimpleNamespace(after=lambda delay, func, *args: func(*args))
+    game.make_move = lambda row, col: game.played.append((row, col))
+    game.cancel_computer_move = lambda: TicTacToe.cancel_computer_move(game)
+    return game
+
+
+def test_cancelled_search_still_answers_quickly():
+    state = GameState(9, 5)
+    state.make_move(4, 4)
+    cancel = threading.Event()
+    cancel.set()
+    started = time.perf_counter()
+    move = choose_move(state, "Hard", time_budget=10.0, cancel=cancel)
+    assert time.perf_counter() - started < 2.0
+    assert move is not None and state.is_legal(*move)
+
+
+def test_results_for_an_old_position_are_dropped():
+    TicTacToe = load_ui()
+    game = fake_game(TicTacToe)
+    future = Future()
+    future.set_result((1, 1))
+
+    cancel = game.search_cancel = threading.Event()
+    game.cancel_computer_move()  # e.g. the player started a new game
+    assert cancel.is_set() and game.search_token == 1
+    TicTacToe.finish_computer_move(game, future, 0, time.perf_counter())
+    assert game.played == []
+
+    TicTacToe.finish_computer_move(game, future, game.search_token, time.perf_counter())
+    assert game.played == [(1, 1)]
@@ -0,0 +1,62 @@
+import random
+
+from engine import TIE, GameState, geometry
+
+
+def play(state, moves):
+    for row, col in moves:
+        assert state.make_move(row, col)
+    return state
+
+
+def test_row_column_and_diagonal_wins():
+    assert play(GameState(), [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]).winner == "X"
+    assert play(GameState(), [(0, 0), (0, 1), (1, 0), (1, 1), (2, 2), (2, 1)]).winner == "O"
+    assert play(GameState(), [(0, 0), (0, 1), (1, 1), (0, 2), (2, 2)]).winner == "X"
+    assert play(GameState(), [(0, 2), (0, 0), (1, 1), (0, 1), (2, 0)]).winner == "X"
+
+
+def test_tie_and_moves_after_the_end():
+    state = play(GameState(), [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)])
+    assert state.winner == TIE and state.is_board_full()
+    assert not state.make_move(0, 0)
+
+
+def test_undo_takes_back_the_last_move():
+    state = play(GameState(), [(0, 0), (1, 1), (0, 1), (2, 2), (0, 2)])
+    assert state.undo_move() == (0, 2, "X")
+    assert state.winner is None and state.current_player == "X" and state.legal_moves()
+    assert state.is_legal(0, 2) and not state.is_legal(1, 1)
+
+
+def test_win_length_on_larger_boards():
+    state = play(GameState(9, 5), [(4, 0), (0, 0), (4, 1), (0, 1), (4, 2), (0, 2), (4, 3), (0, 3)])
+    assert state.winner is None
+    state.make_move(4, 4)
+    assert state.winner == "X" and state.check_winner("X")
+
+
+def test_incremental_check_matches_a_full_scan():
+    rng = random.Random(0)
+    for size, win_length in ((4, 3), (5, 4), (7, 5)):
+        board = geometry(size, win_length)
+        for _ in range(20):
+            state = GameState(size, win_length)
+            while not state.is_over:
+                state.make_move(*rng.choice(state.legal_moves()))
+                player = state.moves_history[-1][2]
+                assert (state.winner == player) == board.is_win(state.bits[player])
+
+
+def test_zobrist_key_is_kept_up_to_date():
+    rng = random.Random(0)
+    state = GameState(7, 5)
+    keys = []
+    while not state.is_over:
+        keys.append(state.key)
+        state.make_move(*rng.choice(state.legal_moves()))
+        assert state.key == state.geometry.position_key(state.bits["X"], state.bits["O"], state.current_player)
+    while state.moves_history:
+        state.undo_move()
+        assert state.key == keys.pop()
+    assert state.key == 0 and state.winner is None
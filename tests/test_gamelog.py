@@ -0,0 +1,80 @@
+import json
+import multiprocessing
+
+import pytest
+
+from gamelog import GameLog, make_record, read_records
+
+
+def game(result, mode="single"):
+    return make_record({"X": "Ada", "O": "Computer"}, mode, "Hard", 3, 3, [(1, 1, "X")], result,
+                       "2024-01-01T00:00:00", "2024-01-01T00:01:00")
+
+
+def open_log(tmp_path, batch_size=4):
+    return GameLog(str(tmp_path / "games.jsonl"), str(tmp_path / "stats.json"), batch_size)
+
+
+def test_games_are_written_in_batches(tmp_path):
+    log = open_log(tmp_path)
+    for _ in range(3):
+        log.record(game("X"))
+    assert not (tmp_path / "games.jsonl").exists()
+    assert log.counters["games_played"] == 3  # counted in memory straight away
+    log.record(game("O"))
+    assert len(list(log.games())) == 4
+    log.record(game("tie"))
+    log.close()
+    snapshot = json.loads((tmp_path / "stats.json").read_text())
+    assert snapshot == {"games_played": 5, "player_wins": 3, "cpu_wins": 1, "ties": 1,
+                        "log_offset": (tmp_path / "games.jsonl").stat().st_size}
+
+
+def test_reopening_replays_only_the_unsnapshotted_tail(tmp_path):
+    log = open_log(tmp_path, batch_size=1)
+    log.record(game("X"))
+    # Another writer appended a game without updating the snapshot
+    with open(tmp_path / "games.jsonl", "a") as f:
+        f.write(json.dumps(game("O")) + "\n")
+    log = open_log(tmp_path)
+    assert log.counters == {"games_played": 2, "player_wins": 1, "cpu_wins": 1, "ties": 0}
+
+
+def test_torn_last_line_is_cut_off(tmp_path):
+    log = open_log(tmp_path, batch_size=1)
+    log.record(game("X"))
+    size = (tmp_path / "games.jsonl").stat().st_size
+    with open(tmp_path / "games.jsonl", "a") as f:
+        f.write(json.dumps(game("O"))[:20])  # crash in the middle of a write
+    log = open_log(tmp_path, batch_size=1)
+    assert (tmp_path / "games.jsonl").stat().st_size == size
+    log.record(game("tie"))
+    assert [record["result"] for record, _ in read_records(str(tmp_path / "games.jsonl"))] == ["X", "tie"]
+    assert log.counters["games_played"] == 2
+
+
+def write_games(args):
+    path, counters_path, count = args
+    log = GameLog(path, counters_path, batch_size=8)
+    for index in range(count):
+        log.record(game(("X", "O", "tie")[index % 3]))
+    log.close()
+
+
+def test_processes_merge_their_counts(tmp_path):
+    path, counters_path = str(tmp_path / "games.jsonl"), str(tmp_path / "stats.json")
+    with multiprocessing.Pool(4) as pool:
+        pool.map(write_games, [(path, counters_path, 60)] * 4)
+    log = GameLog(path, counters_path)
+    assert log.counters == {"games_played": 240, "player_wins": 80, "cpu_wins": 80, "ties": 80}
+    assert len(list(log.games())) == 240
+
+
+def test_a_corrupt_snapshot_is_rebuilt_with_a_warning(tmp_path):
+    log = open_log(tmp_path, batch_size=1)
+    log.record(game("X"))
+    (tmp_path / "stats.json").write_text("{not json")
+    with pytest.warns(RuntimeWarning, match="without any counts from before the log"):
+        log = open_log(tmp_path)
+    assert log.counters["games_played"] == 1
+    assert (tmp_path / "stats.json.corrupt").read_text() == "{not json"
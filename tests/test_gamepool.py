@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from engine import GameState
+from gamepool import BYTES_PER_GAME_BUDGET, CompactGame, GamePool, measure_bytes_per_game
+from server import GameServer
+
+
+def same(compact, state):
+    assert compact.bits == state.bits
+    assert compact.winner == state.winner and compact.is_over == state.is_over
+    assert compact.current_player == state.current_player
+    assert compact.moves_history == state.moves_history
+    assert compact.legal_moves() == state.legal_moves()
+    assert compact.is_board_full() == state.is_board_full()
+    for player in ("X", "O"):
+        assert compact.check_winner(player) == state.check_winner(player)
+
+
+@pytest.mark.parametrize("size, win_length, games", [(3, 3, 20), (5, 4, 10), (7, 5, 5), (17, 5, 1)])
+def test_plays_by_the_same_rules_as_game_state(size, win_length, games):
+    rng = random.Random(size)
+    for _ in range(games):
+        compact, state = CompactGame(size, win_length), GameState(size, win_length)
+        while not state.is_over:
+            row, col = rng.randrange(size), rng.randrange(size)
+            assert compact.is_legal(row, col) == state.is_legal(row, col)
+            assert compact.make_move(row, col) == state.make_move(row, col)
+            same(compact, state)
+        assert not compact.make_move(*divmod(rng.randrange(size * size), size))
+        copy = compact.to_state()
+        assert copy.key == state.key and copy.moves_history == state.moves_history
+        for _ in range(rng.randrange(len(state.moves_history) + 1)):
+            assert compact.undo_move() == state.undo_move()
+            same(compact, state)
+
+
+def test_pool_hands_back_reset_games_per_board_shape():
+    pool = GamePool(max_free=1)
+    game = pool.acquire(3, 3)
+    game.make_move(1, 1)
+    pool.release(game)
+    pool.release(CompactGame(3, 3))  # over max_free: dropped
+    assert len(pool) == 1
+    assert pool.acquire(5, 4) is not game
+    reused = pool.acquire(3, 3)
+    assert reused is game and not reused.moves and reused.x == reused.o == 0 and reused.winner is None
+    assert (pool.created, pool.reused) == (2, 1)
+
+
+def test_hosted_games_fit_the_memory_budget():
+    server = GameServer()
+    hosted = measure_bytes_per_game(lambda: server.create_game(3, 3).state, games=5_000)
+    assert hosted <= BYTES_PER_GAME_BUDGET
@@ -0,0 +1,53 @@
+import pytest
+
+from lobby import BASE_GAP, GAP_PER_SECOND, Lobby, LobbyFull
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_close_ratings_are_paired_longest_waiting_first():
+    clock = Clock()
+    lobby = Lobby(clock=clock)
+    lobby.join("a", "a", 1500, (3, 3))
+    clock.now += 1
+    lobby.join("b", "b", 1520, (3, 3))
+    lobby.join("c", "c", 1500, (9, 5))
+    pairs = lobby.match()
+    assert [(first.player, second.player) for first, second in pairs] == [("a", "b")]
+    assert "a" not in lobby and "c" in lobby and len(lobby) == 1
+
+
+def test_allowed_gap_grows_with_waiting_time():
+    clock = Clock()
+    lobby = Lobby(clock=clock)
+    lobby.join("low", "low", 1200, (3, 3))
+    lobby.join("high", "high", 1200 + BASE_GAP + GAP_PER_SECOND * 2, (3, 3))
+    assert lobby.match() == []
+    clock.now += 2
+    assert len(lobby.match()) == 1
+
+
+def test_capacity_and_leave():
+    lobby = Lobby(max_waiting=1, clock=Clock())
+    lobby.join("a", "a", 1500, (3, 3))
+    with pytest.raises(LobbyFull):
+        lobby.join("b", "b", 1500, (3, 3))
+    assert lobby.leave("a") and not lobby.leave("a")
+    assert lobby.waiting((3, 3)) == 0 and not lobby.buckets
+
+
+def test_snapshot_keeps_a_players_place(tmp_path):
+    path = str(tmp_path / "lobby.json")
+    clock = Clock()
+    lobby = Lobby(persist_path=path, clock=clock)
+    lobby.join("session", "ada", 1500, (3, 3))
+    lobby.save()
+    clock.now += 30
+    restarted = Lobby(persist_path=path, clock=clock)
+    assert restarted.join("new session", "ada", 1500, (3, 3)).enqueued_at == 1000.0
@@ -0,0 +1,48 @@
+import random
+import threading
+import time
+
+from engine import GameState
+import mcts
+
+
+def test_root_visits_add_up_to_the_playouts():
+    state = GameState(5, 4)
+    tree = mcts.Tree(state.geometry, 0, 0, random.Random(0)).run(playouts=500)
+    stats = tree.root_stats()
+    assert tree.playouts == 500
+    assert sum(visits for visits, _ in stats.values()) == 500
+    assert all(0 <= wins <= visits for visits, wins in stats.values())
+
+
+def test_immediate_wins_and_blocks_skip_the_search():
+    state = GameState(7, 5)
+    for move in [(3, 0), (0, 6), (3, 1), (1, 6), (3, 2), (6, 0), (3, 3)]:
+        state.make_move(*move)
+    assert mcts.mcts_move(state, playouts=1, workers=1) == (3, 4)  # O blocks
+    state.make_move(2, 6)
+    assert mcts.mcts_move(state, playouts=1, workers=1) == (3, 4)  # X wins
+
+
+def test_same_seed_same_move():
+    state = GameState(5, 4)
+    state.make_move(2, 2)
+    moves = {mcts.mcts_move(state, time_budget=None, playouts=300, workers=1, rng=random.Random(7))
+             for _ in range(2)}
+    assert len(moves) == 1 and state.is_legal(*moves.pop())
+
+
+def test_cancel_stops_every_worker():
+    state = GameState(9, 5)
+    state.make_move(4, 4)
+    try:
+        mcts.mcts_move(state, time_budget=0.05, workers=2)  # start the pool
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        started = time.perf_counter()
+        move = mcts.mcts_move(state, time_budget=30.0, workers=2, cancel=cancel)
+        assert time.perf_counter() - started < 5.0
+        assert move is not None and state.is_legal(*move)
+        assert mcts.last_run["workers"] == 2
+    finally:
+        mcts.shutdown()
@@ -0,0 +1,40 @@
+import pytest
+
+import protocol
+
+
+def test_every_message_round_trips():
+    name = protocol.pack_name("Ada")
+    frames = [
+        (protocol.NEW, (9, 5, name)),
+        (protocol.JOIN, (7, name)),
+        (protocol.MOVE, (80,)),
+        (protocol.LEAVE, ()),
+        (protocol.QUEUE, (3, 3, 1500, name)),
+        (protocol.WATCH, (7,)),
+        (protocol.SEATED, (7, 1, 3, 3)),
+        (protocol.MOVED, (4, 0, protocol.X_WINS)),
+        (protocol.HISTORY, (7, b"\x03\x03\x00\x00")),
+    ]
+    for opcode, values in frames:
+        frame = protocol.encode(opcode, *values)
+        assert protocol.LENGTH.unpack_from(frame)[0] == len(frame) - protocol.LENGTH.size
+        decoded = protocol.decode(frame[protocol.LENGTH.size:])
+        assert decoded[0] == opcode
+        assert tuple(value.rstrip(b"\0") if isinstance(value, bytes) and len(value) == protocol.NAME_BYTES
+                     else value for value in decoded[1]) == values
+
+
+def test_names_are_cut_on_character_boundaries():
+    data = protocol.pack_name("é" * 20)
+    assert len(data) <= protocol.NAME_BYTES
+    assert protocol.unpack_name(data) == "é" * 8
+
+
+def test_malformed_frames_are_rejected():
+    with pytest.raises(ValueError):
+        protocol.decode(b"")
+    with pytest.raises(ValueError):
+        protocol.decode(b"\x03\x00")
+    with pytest.raises(ValueError):
+        protocol.decode(b"\x7f")
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from ratings import INITIAL_RATING, UNKNOWN_OPPONENT, Ratings, is_rated, rate_game, replay
+from test_statsdb import open_db, record
+
+
+def results(count, seed=0):
+    rng = random.Random(seed)
+    names = ["Ada", "Bob", "Cy", "Di"]
+    for _ in range(count):
+        yield rng.choice(names), rng.choice(names), rng.choice(["X", "O", "tie"])
+
+
+def test_a_game_moves_both_ratings_by_the_same_amount():
+    (x_rating, x_games), (o_rating, o_games) = rate_game((1600.0, 30), (1400.0, 30), "O")
+    assert x_rating < 1600.0 and x_games == 31 and o_games == 31
+    assert x_rating - 1600.0 == pytest.approx(1400.0 - o_rating)
+    (x_rating, _), _ = rate_game((1500.0, 30), (1500.0, 30), "tie")
+    assert x_rating == 1500.0
+
+
+def test_self_play_and_unknown_opponents_are_not_rated():
+    assert is_rated("Ada", "Bob", "tie")
+    assert not is_rated("Ada", "Ada", "X")
+    assert not is_rated("Ada", UNKNOWN_OPPONENT, "X")
+
+
+def test_replay_fills_the_ratings_it_is_given():
+    ratings = Ratings()
+    assert replay([("Ada", "Bob", "X")], ratings) is ratings
+    assert len(ratings) == 2 and ratings.get("Ada")[0] > INITIAL_RATING
+
+
+def test_recompute_matches_incremental_updates(tmp_path):
+    db = open_db(tmp_path)
+    for player_x, player_o, result in results(200):
+        db.record(record(player_x, player_o, result, mode="multi", difficulty=None))
+    db.record(record("Ada", UNKNOWN_OPPONENT, "X", mode="multi", difficulty=None))
+    incremental = sorted(db.leaderboard())
+    assert db.rating(UNKNOWN_OPPONENT) == (INITIAL_RATING, 0)
+
+    assert db.recompute_ratings() == 201
+    recomputed = sorted(db.leaderboard())
+    assert [row[0] for row in recomputed] == [row[0] for row in incremental]
+    for (_, rating, games), (_, expected_rating, expected_games) in zip(recomputed, incremental):
+        assert rating == pytest.approx(expected_rating) and games == expected_games
+    expected = replay(results(200)).players
+    assert {name: games for name, _, games in recomputed} == {name: games for name, (_, games) in expected.items()}
+    db.close()
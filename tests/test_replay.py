@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from engine import EMPTY, GameState
+from replay import Replay, bits_per_move, decode_moves, encode_game, encode_moves
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (9, 5), (19, 5)])
+def test_replay_records_round_trip(size, win_length):
+    rng = random.Random(size)
+    state = GameState(size, win_length)
+    while not state.is_over and len(state.moves_history) < 40:
+        state.make_move(*rng.choice(state.legal_moves()))
+    record = encode_game(state)
+    assert decode_moves(record) == (size, win_length, [row * size + col for row, col, _ in state.moves_history])
+    replay = Replay(record)
+    replay.seek(len(replay))
+    assert replay.state.bits == state.bits and replay.state.winner == state.winner
+
+
+def test_records_use_the_fewest_bits_per_move():
+    assert (bits_per_move(3), bits_per_move(19)) == (4, 9)
+    assert len(encode_moves(3, 3, list(range(9)))) == 4 + 5
+
+
+def test_seeking_back_and_forth():
+    replay = Replay(encode_moves(3, 3, [4, 0, 8, 2]))
+    assert replay.seek(2) == [(1, 1, "X"), (0, 0, "O")]
+    assert replay.step(-1) == [(0, 0, EMPTY)]
+    assert replay.seek(99) == [(0, 0, "O"), (2, 2, "X"), (0, 2, "O")] and replay.at_end
+    assert replay.seek(0) == [(0, 2, EMPTY), (2, 2, EMPTY), (0, 0, EMPTY), (1, 1, EMPTY)]
+
+
+def test_bad_records_are_rejected():
+    with pytest.raises(ValueError):
+        decode_moves(b"\x03")
+    with pytest.raises(ValueError):
+        decode_moves(encode_moves(3, 3, [0, 1])[:-1])
+    with pytest.raises(ValueError):
+        Replay(encode_moves(3, 3, [4, 4]))  # the same cell twice
@@ -0,0 +1,68 @@
+import random
+
+from engine import GameState, geometry
+from search import Searcher, search_move
+
+
+def test_incremental_score_matches_evaluate():
+    rng = random.Random(0)
+    for size, win_length in ((5, 4), (7, 5), (9, 5)):
+        searcher = Searcher(geometry(size, win_length))
+        state = GameState(size, win_length)
+        me, opp = 0, 0
+        score = searcher.evaluate(me, opp)
+        while not state.is_over:
+            row, col = rng.choice(state.legal_moves())
+            cell = row * size + col
+            # The update _child_value makes, seen from the side to move next
+            score = -(score + searcher._delta(me, opp, cell))
+            me, opp = opp, me | state.geometry.cell_bits[cell]
+            state.make_move(row, col)
+            assert score == searcher.evaluate(me, opp)
+            assert score == -searcher.evaluate(opp, me)
+
+
+def test_search_takes_a_win_and_blocks_one():
+    state = GameState(7, 5)
+    for move in [(3, 0), (0, 6), (3, 1), (1, 6), (3, 2), (2, 6), (3, 3)]:
+        state.make_move(*move)
+    # O has to block X's four at (3, 4); if it plays elsewhere, X wins there
+    assert search_move(state, time_budget=1.0, max_depth=2) == (3, 4)
+    state.make_move(6, 6)
+    assert search_move(state, time_budget=1.0, max_depth=2) == (3, 4)
+
+
+def test_depth_one_always_finishes():
+    state = GameState(9, 5)
+    state.make_move(4, 4)
+    searcher = Searcher(state.geometry, time_budget=0.0)
+    move = searcher.search(state)
+    assert move is not None and state.is_legal(*move) and searcher.depth_reached >= 1
+
+
+def test_table_keys_follow_game_state_keys():
+    rng = random.Random(1)
+    state = GameState(7, 5)
+    state.make_move(3, 3)
+    searcher = Searcher(state.geometry, max_depth=1)
+    searcher.search(state)  # sets the per-ply move keys for O to move at the root
+    key = state.key
+    ply = 0
+    while not state.is_over:
+        row, col = rng.choice(state.legal_moves())
+        # The update _child_value makes on the way down the tree
+        key ^= searcher.move_keys[ply & 1][row * state.size + col] ^ searcher.side_key
+        ply += 1
+        state.make_move(row, col)
+        if not state.is_over:
+            assert key == state.key
+
+
+def test_a_missing_key_is_computed_from_the_bitboards():
+    state = GameState(7, 5)
+    for move in [(3, 3), (3, 4), (2, 2)]:
+        state.make_move(*move)
+    with_key, without_key = Searcher(state.geometry, max_depth=3), Searcher(state.geometry, max_depth=3)
+    cell = with_key.search_bits(state.bits["O"], state.bits["X"], "O", state.key)
+    assert without_key.search_bits(state.bits["O"], state.bits["X"], "O") == cell
+    assert with_key.table.keys() == without_key.table.keys()
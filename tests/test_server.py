@@ -0,0 +1,118 @@
+import asyncio
+
+import protocol
+from replay import decode_moves
+from server import Connection, GameServer
+
+
+def run_with_server(scenario):
+    """Run scenario(server, port) against a server on a free loopback port"""
+    async def run():
+        server = GameServer()
+        listener = await server.start("127.0.0.1", 0)
+        try:
+            await scenario(server, listener.sockets[0].getsockname()[1])
+        finally:
+            server.stop()
+            listener.close()
+            await listener.wait_closed()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+
+async def seated_pair(port):
+    host = await Connection.open("127.0.0.1", port)
+    guest = await Connection.open("127.0.0.1", port)
+    host.send(protocol.NEW, 3, 3, protocol.pack_name("host"))
+    _, (game_id, seat, size, win_length) = await host.receive()
+    assert (seat, size, win_length) == (0, 3, 3)
+    guest.send(protocol.JOIN, game_id, protocol.pack_name("guest"))
+    assert (await guest.receive())[0] == protocol.SEATED
+    for connection in (host, guest):
+        opcode, (started_id, name_x, name_o) = await connection.receive()
+        assert opcode == protocol.START and started_id == game_id
+        assert (protocol.unpack_name(name_x), protocol.unpack_name(name_o)) == ("host", "guest")
+    return game_id, host, guest
+
+
+def test_loopback_game():
+    async def scenario(server, port):
+        game_id, host, guest = await seated_pair(port)
+        # X takes the top row while O plays the middle one
+        for cell, player in ((0, host), (3, guest), (1, host), (4, guest), (2, host)):
+            player.send(protocol.MOVE, cell)
+            for connection in (host, guest):
+                opcode, (moved, _, status) = await connection.receive()
+                assert opcode == protocol.MOVED and moved == cell
+        assert status == protocol.X_WINS
+        assert game_id not in server.games
+        await host.close()
+        await guest.close()
+
+    run_with_server(scenario)
+
+
+def test_out_of_turn_and_illegal_moves_are_refused():
+    async def scenario(server, port):
+        _, host, guest = await seated_pair(port)
+        guest.send(protocol.MOVE, 4)
+        assert await guest.receive() == (protocol.ERROR, (protocol.ERR_NOT_YOUR_TURN,))
+        host.send(protocol.MOVE, 9)
+        assert await host.receive() == (protocol.ERROR, (protocol.ERR_ILLEGAL_MOVE,))
+        host.send(protocol.MOVE, 4)
+        assert (await host.receive())[0] == protocol.MOVED
+        assert (await guest.receive())[0] == protocol.MOVED
+        await host.close()
+        assert (await guest.receive())[0] == protocol.LEFT
+        await guest.close()
+
+    run_with_server(scenario)
+
+
+def test_a_session_is_queued_watching_or_seated_never_two():
+    async def scenario(server, port):
+        host = await Connection.open("127.0.0.1", port)
+        host.send(protocol.NEW, 3, 3, protocol.pack_name("host"))
+        game_id = (await host.receive())[1][0]
+        game = server.games[game_id]
+        fan = await Connection.open("127.0.0.1", port)
+
+        fan.send(protocol.QUEUE, 3, 3, 1500, protocol.pack_name("fan"))
+        assert await fan.receive() == (protocol.QUEUED, (1,))
+        fan.send(protocol.WATCH, game_id)
+        assert (await fan.receive())[0] == protocol.HISTORY
+        assert len(server.lobby) == 0 and len(game.spectators) == 1
+
+        fan.send(protocol.QUEUE, 3, 3, 1500, protocol.pack_name("fan"))
+        assert (await fan.receive())[0] == protocol.QUEUED
+        assert len(server.lobby) == 1 and not game.spectators
+
+        fan.send(protocol.WATCH, game_id)
+        await fan.receive()
+        fan.send(protocol.JOIN, game_id, protocol.pack_name("fan"))
+        assert (await fan.receive())[0] == protocol.SEATED
+        assert len(server.lobby) == 0 and not game.spectators
+        await host.close()
+        await fan.close()
+
+    run_with_server(scenario)
+
+
+def test_spectators_get_the_history_then_each_move():
+    async def scenario(server, port):
+        game_id, host, guest = await seated_pair(port)
+        for cell, player in ((4, host), (0, guest)):
+            player.send(protocol.MOVE, cell)
+            for connection in (host, guest):
+                await connection.receive()
+        spectator = await Connection.open("127.0.0.1", port)
+        spectator.send(protocol.WATCH, game_id)
+        opcode, (watched, record) = await spectator.receive()
+        assert opcode == protocol.HISTORY and watched == game_id
+        assert decode_moves(record) == (3, 3, [4, 0])
+        host.send(protocol.MOVE, 8)
+        assert await spectator.receive() == (protocol.MOVED, (8, 0, protocol.RUNNING))
+        for connection in (host, guest, spectator):
+            await connection.close()
+
+    run_with_server(scenario)
@@ -0,0 +1,45 @@
+from engine import CELL_BITS, FULL_MASK, GameState, is_win, iter_bits
+import solver
+
+
+def minimax(me, opp, cache={}):
+    """Plain minimax without pruning, tables or symmetry, scored like solver"""
+    key = (me, opp)
+    if key not in cache:
+        free = FULL_MASK & ~(me | opp)
+        remaining = bin(free).count("1")
+        scores = [remaining if is_win(me | CELL_BITS[i]) else -minimax(opp, me | CELL_BITS[i])
+                  for i in iter_bits(free)]
+        cache[key] = max(scores, default=0)
+    return cache[key]
+
+
+def positions(me=0, opp=0, seen=None):
+    """Every unfinished position reachable from the empty board, as (mover bits, opponent bits)"""
+    seen = set() if seen is None else seen
+    if (me, opp) in seen or is_win(opp) or me | opp == FULL_MASK:
+        return seen
+    seen.add((me, opp))
+    for i in iter_bits(FULL_MASK & ~(me | opp)):
+        positions(opp, me | CELL_BITS[i], seen)
+    return seen
+
+
+def test_empty_board_is_a_draw():
+    solver.clear_cache()
+    assert solver.solve(GameState()) == 0
+
+
+def test_solver_agrees_with_minimax():
+    solver.clear_cache()
+    for me, opp in positions():
+        assert solver.negamax(me, opp)[0] == minimax(me, opp)
+
+
+def test_best_move_wins_or_blocks():
+    state = GameState()
+    for move in [(0, 0), (1, 1), (0, 1)]:
+        state.make_move(*move)
+    assert solver.best_move(state) == (0, 2)
+    state.make_move(2, 2)
+    assert solver.best_move(state) == (0, 2)
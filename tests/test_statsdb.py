@@ -0,0 +1,78 @@
+import json
+import multiprocessing
+
+import gamelog
+from statsdb import StatsDB
+
+
+def record(x, o, result, mode="single", difficulty="Hard", ended_at="2024-01-01T00:00:00"):
+    moves = [(0, 0, "X")]
+    return gamelog.make_record({"X": x, "O": o}, mode, difficulty, 3, 3, moves, result, ended_at, ended_at)
+
+
+def open_db(tmp_path):
+    return StatsDB(str(tmp_path / "stats.db"), str(tmp_path / "games.jsonl"), str(tmp_path / "stats.json"))
+
+
+def test_migration_imports_the_log_and_keeps_the_legacy_base(tmp_path):
+    log = gamelog.GameLog(str(tmp_path / "games.jsonl"), str(tmp_path / "stats.json"))
+    log.record(record("Ada", "Computer", "X"))
+    log.record(record("Ada", "Computer", "O"))
+    log.close()
+    snapshot = json.loads((tmp_path / "stats.json").read_text())
+    # Ten more games were counted before the log existed
+    snapshot.update(games_played=12, player_wins=6, cpu_wins=4, ties=2)
+    (tmp_path / "stats.json").write_text(json.dumps(snapshot))
+
+    db = open_db(tmp_path)
+    assert db.counters() == {"games_played": 12, "player_wins": 6, "cpu_wins": 4, "ties": 2}
+    assert db.counters(difficulty="Hard", mode="single")["games_played"] == 2
+    assert db.player_record("Ada") == (1, 1, 0)
+    db.close()
+
+    # Migration runs once; reopening does not import the log again
+    db = open_db(tmp_path)
+    assert db.counters()["games_played"] == 12
+    db.close()
+
+
+def test_totals_match_filtered_queries(tmp_path):
+    db = open_db(tmp_path)
+    games = [
+        record("Ada", "Computer", "X", difficulty="Easy"),
+        record("Ada", "Bob", "tie", mode="multi", difficulty=None),
+        record("Bob", "Ada", "X", mode="multi", difficulty=None),
+        record("Ada", "Ada", "O", mode="multi", difficulty=None),
+        record("Ada", "Computer", "O", difficulty="Hard", ended_at="2024-02-01T00:00:00"),
+    ]
+    for game in games:
+        db.record(game)
+    everything = {"since": "2000-01-01", "until": "2100-01-01"}
+    for filters in ({}, {"difficulty": "Easy", "mode": "single"}, {"mode": "multi"}):
+        assert db.counters(**filters) == db.counters(**filters, **everything)
+        for name in db.player_names():
+            assert db.player_record(name, **filters) == db.player_record(name, **filters, **everything)
+    assert db.player_record("Ada") == (2, 3, 1)
+    assert db.counters(since="2024-01-15")["games_played"] == 1
+    db.close()
+
+
+
+def write_records(args):
+    directory, count = args
+    db = StatsDB(directory + "/stats.db", directory + "/games.jsonl", directory + "/stats.json")
+    for index in range(count):
+        db.record(record("Ada", "Bob", ("X", "O", "tie")[index % 3], mode="multi", difficulty=None))
+    db.close()
+
+
+def test_processes_write_one_database(tmp_path):
+    open_db(tmp_path).close()
+    with multiprocessing.Pool(4) as pool:
+        pool.map(write_records, [(str(tmp_path), 50)] * 4)
+    db = open_db(tmp_path)
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db.counters()["games_played"] == 200
+    assert db.player_record("Ada") == (68, 68, 64)
+    assert db.rating("Ada")[1] == 200
+    db.close()
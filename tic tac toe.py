@@ -1,11 +1,20 @@
-import random
+import time
+_started = time.perf_counter()
+
+import os
 import tkinter as tk
 from tkinter import messagebox, font
-from functools import partial
-from copy import deepcopy
-import json
-import os
-from datetime import datetime
+
+from engine import BOARD_PRESETS, EMPTY, GameState
+from boardview import make_board
+import metrics
+
+# Only what the main menu needs is imported up front. The AI, statistics
+# database, networking and replay modules load the first time they're used.
+
+def now_iso():
+    from datetime import datetime
+    return datetime.now().isoformat(timespec="seconds")
 
 class TicTacToe:
     def __init__(self):
@@ -18,7 +27,6 @@ class TicTacToe:
         # Set custom font and colors
         self.header_font = font.Font(family="Helvetica", size=16, weight="bold")
         self.button_font = font.Font(family="Helvetica", size=12)
-        self.game_font = font.Font(family="Helvetica", size=14, weight="bold")
         
         # Colors
         self.primary_color = "#3498DB"  # Blue
@@ -26,26 +34,81 @@ class TicTacToe:
         self.accent_color = "#E74C3C"  # Red
         self.text_color = "#ECF0F1"  # White
         self.bg_color = "#2C3E50"  # Dark Blue
+        self.board_colors = {
+            "bg": self.bg_color,
+            "text": self.text_color,
+            "empty": "#34495E",
+            "highlight": "#F1C40F",  # Yellow
+            "X": self.primary_color,
+            "O": self.secondary_color,
+        }
         
         # Game variables
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.current_player = "X"
+        self.game = GameState()
         self.player_score = {"X": 0, "O": 0, "Ties": 0}
         self.difficulty = "Medium"  # Default difficulty
+        self.board_size, self.win_length = BOARD_PRESETS[0]  # Default 3x3, three in a row
         self.game_mode = "single"  # Default game mode
         self.player_names = {"X": "Player 1", "O": "Player 2/CPU"}
-        self.game_buttons = []
         self.game_active = False
-        self.moves_history = []
         
-        # Create stats file if doesn't exist
-        self.stats_file = os.path.join(os.path.dirname(__file__), "tictactoe_stats.json")
-        if not os.path.exists(self.stats_file):
-            with open(self.stats_file, "w") as f:
-                json.dump({"games_played": 0, "player_wins": 0, "cpu_wins": 0, "ties": 0}, f)
+        # Screens are built once and cached; switching raises the cached frame.
+        # Per-screen widgets that change later are kept in plain dicts.
+        self.screens = {}
+        self.current_screen = None
+        self.board_screens = {}  # board size -> widgets of that board screen
+        self.replay_screens = {}
+        self.board_view = None  # widgets of the board screen on display
+        
+        # CPU moves are searched on a worker thread; bumping search_token
+        # invalidates any search still running for an earlier position
+        self.ai_executor = None
+        self.search_token = 0
+        self.search_cancel = None
+        
+        # Network play: the server decides every move, we only display them
+        self.net_client = None
+        self.network_seat = None
+        self.network_name = "Player"
+        
+        # Replays step one GameState in place; last_replay keeps the game just finished
+        self.replay = None
+        self.replay_job = None
+        self.replay_speed = 1.0
+        self.last_replay = None
+        self.last_replay_names = None
+        
+        # Game history and statistics, opened on first use (see stats)
+        self._stats = None
+        self.game_started_at = None
+        
+        # F12 switches timing on and off; turning it off writes the metrics file
+        self.metrics_path = metrics.configure_from_env() or metrics.METRICS_FILE
+        self.window.bind("<F12>", self.toggle_metrics)
         
         self.show_main_menu()
-        
+    
+    @property
+    def stats(self):
+        # Opening the database can migrate the old JSON files, so it waits until needed
+        if self._stats is None:
+            from statsdb import StatsDB
+            self._stats = StatsDB()
+        return self._stats
+    
+    # Board state lives on the headless engine; these keep the old attribute names working
+    @property
+    def board(self):
+        return self.game.board
+    
+    @property
+    def current_player(self):
+        return self.game.current_player
+    
+    @property
+    def moves_history(self):
+        return self.game.moves_history
+    
     def create_button(self, parent, text, font, bg, fg, width, height=None, command=None, **kwargs):
         """Create standardized buttons for consistent UI"""
         # Remove the hardcoded activebackground
@@ -62,7 +125,7 @@ class TicTacToe:
         if height:
             button.config(height=height)
         return button
-
+    
     def create_label(self, parent, text, font, bg, fg, pady=5, **kwargs):
         """Create standardized labels for consistent UI"""
         return tk.Label(
@@ -74,15 +137,35 @@ class TicTacToe:
             pady=pady,
             **kwargs
         )
-
+    
+    def show_screen(self, name, build):
+        """Raise the cached frame for name, calling build(frame) the first time"""
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = tk.Frame(self.window, bg=self.bg_color)
+            screen.place(relx=0, rely=0, relwidth=1, relheight=1)
+            started = time.perf_counter()
+            build(screen)
+            metrics.observe(f"ui.{build.__name__}", time.perf_counter() - started)
+            self.screens[name] = screen
+        if screen is not self.current_screen:
+            screen.tkraise()
+            self.current_screen = screen
+        return screen
+    
+    def turn_text(self):
+        return f"Current Turn: {self.player_names[self.current_player]} ({self.current_player})"
+    
+    def turn_color(self):
+        return self.primary_color if self.current_player == "X" else self.secondary_color
+    
     def show_main_menu(self):
-        # Clear window
-        for widget in self.window.winfo_children():
-            widget.destroy()
-            
+        self.show_screen("main_menu", self.build_main_menu)
+    
+    def build_main_menu(self, screen):
         # Header
         header = self.create_label(
-            self.window, 
+            screen,
             text="TIC-TAC-TOE DELUXE",
             font=("Helvetica", 24, "bold"),
             bg=self.bg_color,
@@ -92,7 +175,7 @@ class TicTacToe:
         header.pack(fill=tk.X)
         
         # Menu frame
-        menu_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
+        menu_frame = tk.Frame(screen, bg=self.bg_color, pady=20)
         menu_frame.pack()
         
         # Game mode buttons
@@ -130,6 +213,18 @@ class TicTacToe:
         )
         multi_player_btn.pack(pady=10)
         
+        network_btn = self.create_button(
+            menu_frame,
+            text="Network Play",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=20,
+            height=2,
+            command=self.setup_network_screen
+        )
+        network_btn.pack(pady=10)
+        
         stats_btn = self.create_button(
             menu_frame,
             text="Game Statistics",
@@ -157,7 +252,7 @@ class TicTacToe:
         
         # Version
         version_label = self.create_label(
-            self.window,
+            screen,
             text="v2.0",
             font=("Helvetica", 8),
             bg=self.bg_color,
@@ -171,12 +266,11 @@ class TicTacToe:
         self.setup_difficulty_screen()
     
     def setup_difficulty_screen(self):
-        # Clear window
-        for widget in self.window.winfo_children():
-            widget.destroy()
-            
+        self.show_screen("difficulty", self.build_difficulty_screen)
+    
+    def build_difficulty_screen(self, screen):
         header = self.create_label(
-            self.window, 
+            screen,
             text="SELECT DIFFICULTY",
             font=("Helvetica", 20, "bold"),
             bg=self.bg_color,
@@ -185,7 +279,7 @@ class TicTacToe:
         )
         header.pack(fill=tk.X)
         
-        diff_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
+        diff_frame = tk.Frame(screen, bg=self.bg_color, pady=20)
         diff_frame.pack()
         
         easy_btn = self.create_button(
@@ -224,6 +318,18 @@ class TicTacToe:
         )
         hard_btn.pack(pady=10)
         
+        expert_btn = self.create_button(
+            diff_frame,
+            text="Expert (Monte Carlo)",
+            font=self.button_font,
+            bg=self.secondary_color,
+            fg=self.text_color,
+            width=20,
+            height=2,
+            command=lambda: self.set_difficulty("Expert")
+        )
+        expert_btn.pack(pady=10)
+        
         back_btn = self.create_button(
             diff_frame,
             text="Back",
@@ -241,17 +347,256 @@ class TicTacToe:
         self.difficulty = difficulty
         self.setup_player_names()
     
+    def setup_network_screen(self):
+        self.close_network()
+        self.show_screen("network", self.build_network_screen)
+        self.network_status.config(text="")
+    
+    def build_network_screen(self, screen):
+        from netclient import DEFAULT_PORT
+        
+        header = self.create_label(
+            screen,
+            text="NETWORK PLAY",
+            font=("Helvetica", 20, "bold"),
+            bg=self.bg_color,
+            fg=self.text_color,
+            pady=20
+        )
+        header.pack(fill=tk.X)
+        
+        net_frame = tk.Frame(screen, bg=self.bg_color, pady=10)
+        net_frame.pack()
+        
+        entries = {}
+        for key, text, default in (
+            ("name", "Your Name:", self.network_name),
+            ("host", "Server:", "127.0.0.1"),
+            ("port", "Port:", str(DEFAULT_PORT)),
+        ):
+            label = self.create_label(
+                net_frame,
+                text=text,
+                font=self.button_font,
+                bg=self.bg_color,
+                fg=self.text_color,
+                pady=2
+            )
+            label.pack()
+            entry = tk.Entry(net_frame, font=self.button_font, width=20, justify='center')
+            entry.insert(0, default)
+            entry.pack(pady=2)
+            entries[key] = entry
+        
+        preset_names = {f"{n}x{n} ({k} in a row)": (n, k) for n, k in BOARD_PRESETS}
+        size_var = tk.StringVar(value=next(iter(preset_names)))
+        size_menu = tk.OptionMenu(net_frame, size_var, *preset_names)
+        size_menu.config(font=self.button_font, width=17)
+        size_menu.pack(pady=5)
+        
+        host_btn = self.create_button(
+            net_frame,
+            text="Host New Game",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=20,
+            command=lambda: self.connect_network(entries, "host", preset_names[size_var.get()])
+        )
+        host_btn.pack(pady=5)
+        
+        match_btn = self.create_button(
+            net_frame,
+            text="Find Match",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=20,
+            command=lambda: self.connect_network(entries, "queue", preset_names[size_var.get()])
+        )
+        match_btn.pack(pady=5)
+        
+        game_id_entry = tk.Entry(net_frame, font=self.button_font, width=20, justify='center')
+        game_id_entry.insert(0, "Game #")
+        game_id_entry.pack(pady=5)
+        
+        join_btn = self.create_button(
+            net_frame,
+            text="Join Game",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=20,
+            command=lambda: self.connect_network(entries, "join", game_id_entry.get().strip("Game #"))
+        )
+        join_btn.pack(pady=5)
+        
+        watch_btn = self.create_button(
+            net_frame,
+            text="Watch Game",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=20,
+            command=lambda: self.connect_network(entries, "watch", game_id_entry.get().strip("Game #"))
+        )
+        watch_btn.pack(pady=5)
+        
+        back_btn = self.create_button(
+            net_frame,
+            text="Back",
+            font=self.button_font,
+            bg=self.accent_color,
+            fg=self.text_color,
+            width=20,
+            activebackground="#C0392B",
+            command=self.show_main_menu
+        )
+        back_btn.pack(pady=10)
+        
+        self.network_status = self.create_label(
+            net_frame,
+            text="",
+            font=self.button_font,
+            bg=self.bg_color,
+            fg="#F39C12",
+            pady=5
+        )
+        self.network_status.pack()
+    
+    def connect_network(self, entries, action, value):
+        from netclient import NetClient
+        
+        try:
+            if action in ("join", "watch"):
+                value = int(value)
+            client = NetClient(entries["host"].get().strip(), int(entries["port"].get()))
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Network Play", f"Could not start network game: {error}")
+            return
+        
+        self.close_network()
+        self.net_client = client
+        self.game_mode = "network"
+        self.network_name = entries["name"].get().strip() or "Player"
+        if action == "host":
+            client.new_game(*value, self.network_name)
+        elif action == "queue":
+            rating = int(self.stats.rating(self.network_name)[0])
+            client.queue(*value, max(0, min(rating, 0xFFFF)), self.network_name)
+            self.network_status.config(text="Looking for an opponent...")
+        elif action == "watch":
+            client.watch(value)
+        else:
+            client.join(value, self.network_name)
+        self.window.after(30, self.poll_network)
+    
+    def poll_network(self):
+        client = self.net_client
+        if client is None:
+            return
+        for opcode, values in client.poll():
+            self.handle_network_event(opcode, values)
+            if self.net_client is not client:
+                return  # the event closed this connection
+        self.window.after(30, self.poll_network)
+    
+    def handle_network_event(self, opcode, values):
+        import protocol
+        from netclient import DISCONNECTED
+        from replay import Replay
+        
+        if opcode == protocol.SEATED:
+            game_id, seat, size, win_length = values
+            self.network_seat = protocol.SEATS[seat]
+            opponent = "O" if self.network_seat == "X" else "X"
+            self.player_names[self.network_seat] = self.network_name
+            self.player_names[opponent] = "Opponent"  # until START names them
+            self.board_size, self.win_length = size, win_length
+            self.game = GameState(size, win_length)
+            self.game_active = False
+            self.create_game_board()
+            self.turn_indicator.config(text=f"Game #{game_id}: waiting for an opponent...", fg="#F39C12")
+        elif opcode == protocol.START:
+            from ratings import UNKNOWN_OPPONENT
+            _, name_x, name_o = values
+            opponent = "O" if self.network_seat == "X" else "X"
+            name = protocol.unpack_name(name_o if opponent == "O" else name_x)
+            # An unnamed opponent is stored as UNKNOWN_OPPONENT, which is never rated
+            self.player_names[opponent] = name or UNKNOWN_OPPONENT
+            self.board_view["px_name"].config(text=self.player_names["X"])
+            self.board_view["po_name"].config(text=self.player_names["O"])
+            self.game_active = True
+            self.game_started_at = now_iso()
+            self.turn_indicator.config(text=self.turn_text(), fg=self.turn_color())
+        elif opcode == protocol.HISTORY:
+            # Spectating: catch up on the moves so far, then follow MOVED frames
+            game_id, record = values
+            try:
+                replay = Replay(record)
+            except ValueError:
+                messagebox.showerror("Network Play", "Received a damaged game record")
+                self.setup_network_screen()
+                return
+            replay.seek(len(replay))
+            self.network_seat = None
+            self.player_names = {"X": "Player X", "O": "Player O"}
+            self.game = replay.state
+            self.board_size, self.win_length = self.game.size, self.game.win_length
+            self.game_active = not self.game.is_over
+            self.create_game_board()
+            self.turn_indicator.config(text=f"Watching game #{game_id}", fg="#F39C12")
+        elif opcode == protocol.QUEUED:
+            self.network_status.config(text=f"Looking for an opponent ({values[0]} waiting)...")
+        elif opcode == protocol.MOVED:
+            cell, _, _ = values
+            self.make_move(*divmod(cell, self.board_size))
+        elif opcode == protocol.ERROR:
+            errors = {
+                protocol.ERR_NO_GAME: "No such game",
+                protocol.ERR_GAME_FULL: "That game is full",
+                protocol.ERR_NOT_YOUR_TURN: "It's not your turn",
+                protocol.ERR_ILLEGAL_MOVE: "Illegal move",
+                protocol.ERR_LOBBY_FULL: "The lobby is full, try again later",
+            }
+            messagebox.showerror("Network Play", errors.get(values[0], "Server error"))
+            if values[0] in (protocol.ERR_NO_GAME, protocol.ERR_GAME_FULL, protocol.ERR_LOBBY_FULL):
+                self.setup_network_screen()
+        elif opcode in (protocol.LEFT, DISCONNECTED):
+            self.close_network()
+            if self.game_active:
+                self.end_game("Opponent left the game" if self.network_seat else "A player left the game")
+    
+    def close_network(self):
+        if self.net_client is not None:
+            self.net_client.close()
+            self.net_client = None
+    
     def setup_multi_player(self):
         self.game_mode = "multi"
         self.setup_player_names()
     
     def setup_player_names(self):
-        # Clear window
-        for widget in self.window.winfo_children():
-            widget.destroy()
-            
+        self.show_screen("player_names", self.build_player_names)
+        
+        # The cached screen keeps typed names; only the O field depends on the mode
+        widgets = self.name_widgets
+        p2_entry = widgets["p2_entry"]
+        p2_entry.config(state=tk.NORMAL)
+        if self.game_mode == "single":
+            widgets["p2_label"].config(text="CPU (O):")
+            p2_entry.delete(0, tk.END)
+            p2_entry.insert(0, f"CPU ({self.difficulty})")
+            p2_entry.config(state=tk.DISABLED)
+        else:
+            widgets["p2_label"].config(text="Player 2 (O):")
+            if p2_entry.get().startswith("CPU ("):
+                p2_entry.delete(0, tk.END)
+                p2_entry.insert(0, "Player 2")
+    
+    def build_player_names(self, screen):
         header = self.create_label(
-            self.window, 
+            screen,
             text="PLAYER NAMES",
             font=("Helvetica", 20, "bold"),
             bg=self.bg_color,
@@ -260,7 +605,7 @@ class TicTacToe:
         )
         header.pack(fill=tk.X)
         
-        name_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
+        name_frame = tk.Frame(screen, bg=self.bg_color, pady=20)
         name_frame.pack()
         
         # Player 1 name
@@ -283,11 +628,10 @@ class TicTacToe:
         p1_entry.insert(0, "Player 1")
         p1_entry.pack(pady=5)
         
-        # Player 2 / CPU name
-        p2_text = "Player 2 (O):" if self.game_mode == "multi" else "CPU (O):"
+        # Player 2 / CPU name; setup_player_names fills these in for the mode
         p2_label = self.create_label(
             name_frame,
-            text=p2_text,
+            text="Player 2 (O):",
             font=self.button_font,
             bg=self.bg_color,
             fg=self.text_color,
@@ -301,12 +645,25 @@ class TicTacToe:
             width=20,
             justify='center'
         )
-        p2_default = "Player 2" if self.game_mode == "multi" else f"CPU ({self.difficulty})"
-        p2_entry.insert(0, p2_default)
+        p2_entry.insert(0, "Player 2")
         p2_entry.pack(pady=5)
         
-        if self.game_mode == "single":
-            p2_entry.config(state=tk.DISABLED)
+        # Board size
+        size_label = self.create_label(
+            name_frame,
+            text="Board Size:",
+            font=self.button_font,
+            bg=self.bg_color,
+            fg=self.text_color,
+            pady=5
+        )
+        size_label.pack()
+        
+        preset_names = {f"{n}x{n} ({k} in a row)": (n, k) for n, k in BOARD_PRESETS}
+        size_var = tk.StringVar(value=f"{self.board_size}x{self.board_size} ({self.win_length} in a row)")
+        size_menu = tk.OptionMenu(name_frame, size_var, *preset_names)
+        size_menu.config(font=self.button_font, width=17)
+        size_menu.pack(pady=5)
         
         # Start game button
         start_btn = self.create_button(
@@ -317,9 +674,9 @@ class TicTacToe:
             fg=self.text_color,
             width=20,
             height=2,
-            command=lambda: self.start_game(p1_entry.get(), p2_entry.get())
+            command=lambda: self.start_game(p1_entry.get(), p2_entry.get(), *preset_names[size_var.get()])
         )
-        start_btn.pack(pady=30)
+        start_btn.pack(pady=20)
         
         back_btn = self.create_button(
             name_frame,
@@ -333,26 +690,45 @@ class TicTacToe:
             command=self.show_main_menu
         )
         back_btn.pack(pady=10)
+        
+        self.name_widgets = {"p2_label": p2_label, "p2_entry": p2_entry}
     
-    def start_game(self, p1_name, p2_name):
+    def start_game(self, p1_name, p2_name, board_size=3, win_length=3):
         self.player_names["X"] = p1_name if p1_name.strip() else "Player 1"
         self.player_names["O"] = p2_name if p2_name.strip() else ("Player 2" if self.game_mode == "multi" else f"CPU ({self.difficulty})")
         
         # Reset game state
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.current_player = "X"
+        self.board_size, self.win_length = board_size, win_length
+        self.game = GameState(board_size, win_length)
         self.game_active = True
-        self.moves_history = []
+        self.game_started_at = now_iso()
         
         self.create_game_board()
     
+    @metrics.timed("ui.create_game_board")
     def create_game_board(self):
-        # Clear window
-        for widget in self.window.winfo_children():
-            widget.destroy()
-            
+        # One cached board screen per board size; a new game only refreshes it
+        self.show_screen(("board", self.board_size), self.build_game_board)
+        self.board_view = self.board_screens[self.board_size]
+        view = self.board_view
+        
+        view["px_name"].config(text=self.player_names["X"])
+        view["po_name"].config(text=self.player_names["O"])
+        self.update_scores()
+        self.turn_indicator = view["turn_indicator"]
+        self.turn_indicator.config(text=self.turn_text(), fg=self.turn_color())
+        view["engine_info"].config(text="")
+        view["play_again_btn"].place_forget()
+        view["replay_btn"].place_forget()
+        view["cells"].sync(self.moves_history)
+        
+        # If single player and computer goes first
+        if self.game_mode == "single" and self.current_player == "O":
+            self.schedule_computer_move()
+    
+    def build_game_board(self, screen):
         # Score header
-        score_frame = tk.Frame(self.window, bg=self.bg_color, pady=10)
+        score_frame = tk.Frame(screen, bg=self.bg_color, pady=10)
         score_frame.pack(fill=tk.X)
         
         # Player X info
@@ -428,40 +804,33 @@ class TicTacToe:
         po_score.pack()
         
         # Current turn indicator
-        self.turn_indicator = self.create_label(
-            self.window,
-            text=f"Current Turn: {self.player_names[self.current_player]} ({self.current_player})",
+        turn_indicator = self.create_label(
+            screen,
+            text="",
             font=self.header_font,
             bg=self.bg_color,
-            fg=self.primary_color if self.current_player == "X" else self.secondary_color,
+            fg=self.primary_color,
             pady=10
         )
-        self.turn_indicator.pack()
+        turn_indicator.pack()
+        
+        # Search speed of the Monte Carlo CPU, filled in after each of its moves
+        engine_info = self.create_label(
+            screen,
+            text="",
+            font=("Helvetica", 10),
+            bg=self.bg_color,
+            fg=self.text_color,
+            pady=0
+        )
+        engine_info.pack()
         
         # Game board
-        board_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
-        board_frame.pack()
-        
-        self.game_buttons = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                button = tk.Button(
-                    board_frame,
-                    text="",
-                    font=("Helvetica", 24, "bold"),
-                    width=4,
-                    height=2,
-                    bg="#34495E",
-                    fg=self.text_color,
-                    command=lambda r=i, c=j: self.make_move(r, c)
-                )
-                button.grid(row=i, column=j, padx=5, pady=5)
-                row.append(button)
-            self.game_buttons.append(row)
-            
+        cells = make_board(screen, self.board_size, self.player_move, self.board_colors)
+        cells.frame.pack()
+        
         # Control buttons
-        control_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
+        control_frame = tk.Frame(screen, bg=self.bg_color, pady=20)
         control_frame.pack()
         
         undo_btn = self.create_button(
@@ -497,268 +866,265 @@ class TicTacToe:
         )
         menu_btn.pack(side=tk.LEFT, padx=5)
         
-        # If single player and computer goes first
-        if self.game_mode == "single" and self.current_player == "O":
-            self.window.after(500, self.computer_move)
+        # End of game buttons, placed by end_game and hidden again on reset
+        play_again_btn = self.create_button(
+            screen,
+            text="Play Again",
+            font=self.button_font,
+            bg=self.secondary_color,
+            fg=self.text_color,
+            width=15,
+            height=2,
+            command=self.reset_board
+        )
+        replay_btn = self.create_button(
+            screen,
+            text="Watch Replay",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=15,
+            command=lambda: self.show_replay(self.last_replay, self.last_replay_names, self.show_main_menu)
+        )
+        
+        self.board_screens[self.board_size] = {
+            "px_name": px_name,
+            "px_score": px_score,
+            "ties_score": ties_score,
+            "po_name": po_name,
+            "po_score": po_score,
+            "turn_indicator": turn_indicator,
+            "engine_info": engine_info,
+            "cells": cells,
+            "play_again_btn": play_again_btn,
+            "replay_btn": replay_btn,
+        }
+    
+    def update_scores(self):
+        view = self.board_view
+        view["px_score"].config(text=f"Score: {self.player_score['X']}")
+        view["ties_score"].config(text=f"{self.player_score['Ties']}")
+        view["po_score"].config(text=f"Score: {self.player_score['O']}")
+    
+    def paint_cell(self, row, col, player):
+        self.board_view["cells"].paint(row, col, player)
     
+    @metrics.timed("ui.make_move")
     def make_move(self, row, col):
         # Check if the cell is empty and the game is active
-        if self.board[row][col] == " " and self.game_active:
-            # Record move for undo feature
-            self.moves_history.append((row, col, self.current_player))
+        if self.game_active and self.game.make_move(row, col):
+            player = self.moves_history[-1][2]
             
             # Update board
-            self.board[row][col] = self.current_player
-            self.game_buttons[row][col].config(
-                text=self.current_player,
-                bg=self.primary_color if self.current_player == "X" else self.secondary_color,
-                state=tk.DISABLED
-            )
+            self.paint_cell(row, col, player)
             
             # Check for win or tie
-            if self.check_winner(self.current_player):
-                self.end_game(f"{self.player_names[self.current_player]} wins!")
-                self.player_score[self.current_player] += 1
-                self.update_stats(self.current_player)
+            if self.game.winner == player:
+                self.end_game(f"{self.player_names[player]} wins!")
+                self.player_score[player] += 1
+                self.update_scores()
+                self.update_stats(player)
                 return
-            elif self.is_board_full():
+            elif self.game.is_over:
                 self.end_game("It's a tie!")
                 self.player_score["Ties"] += 1
+                self.update_scores()
                 self.update_stats("tie")
                 return
             
-            # Switch player
-            self.current_player = "O" if self.current_player == "X" else "X"
-            self.turn_indicator.config(
-                text=f"Current Turn: {self.player_names[self.current_player]} ({self.current_player})",
-                fg=self.primary_color if self.current_player == "X" else self.secondary_color
-            )
+            # Turn indicator follows the engine's player switch
+            self.turn_indicator.config(text=self.turn_text(), fg=self.turn_color())
             
             # If single player mode and it's computer's turn
             if self.game_mode == "single" and self.current_player == "O":
-                self.window.after(500, self.computer_move)
+                self.schedule_computer_move()
     
-    def computer_move(self):
-        if not self.game_active:
+    def player_move(self, row, col):
+        # Network moves only count once the server echoes them back
+        if self.game_mode == "network":
+            if self.game_active and self.current_player == self.network_seat and self.net_client is not None:
+                self.net_client.move(row * self.board_size + col)
             return
-            
-        if self.difficulty == "Easy":
-            move = self.get_easy_move()
-        elif self.difficulty == "Medium":
-            if random.random() < 0.7:  # 70% chance of smart move
-                move = self.get_smart_move()
-            else:
-                move = self.get_easy_move()
-        else:  # Hard difficulty
-            move = self.get_smart_move()
-            
+        # Ignore clicks while the CPU is thinking
+        if self.game_mode == "single" and self.current_player == "O":
+            return
+        self.make_move(row, col)
+    
+    def schedule_computer_move(self):
+        self.window.after(500, self.computer_move, self.search_token)
+    
+    def computer_move(self, token=None):
+        if token is not None and token != self.search_token:
+            return
+        if not self.game_active or self.game_mode != "single" or self.current_player != "O":
+            return
+        
+        import random
+        import threading
+        from ai import choose_move
+        
+        if self.ai_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.search_cancel = threading.Event()
+        future = self.ai_executor.submit(
+            choose_move, self.game.copy(), self.difficulty, random.Random(), cancel=self.search_cancel
+        )
+        self.window.after(20, self.finish_computer_move, future, self.search_token, time.perf_counter())
+    
+    def finish_computer_move(self, future, token, started):
+        # Poll from the Tk thread; widgets must not be touched from the worker
+        if not future.done():
+            self.window.after(20, self.finish_computer_move, future, token, started)
+            return
+        metrics.observe("ui.computer_move", time.perf_counter() - started)
+        if token != self.search_token or not self.game_active:
+            return  # result belongs to a position that no longer exists
+        if self.difficulty == "Expert":
+            self.show_engine_info()
+        
+        move = future.result()
         if move:
             self.make_move(move[0], move[1])
     
+    def show_engine_info(self):
+        from mcts import last_run
+        if last_run["seconds"]:
+            rate = last_run["playouts"] / last_run["seconds"]
+            self.board_view["engine_info"].config(
+                text=f"CPU: {last_run['playouts']:,} playouts, {rate:,.0f}/s on {last_run['workers']} core(s)"
+            )
+    
+    def cancel_computer_move(self):
+        self.search_token += 1
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+            self.search_cancel = None
+    
+    def shutdown(self):
+        self.cancel_computer_move()
+        self.close_network()
+        if self.ai_executor is not None:
+            self.ai_executor.shutdown(wait=False)
+            from mcts import shutdown
+            shutdown()
+        if self._stats is not None:
+            self._stats.close()
+        if metrics.enabled():
+            metrics.export(self.metrics_path)
+    
+    def toggle_metrics(self, event=None):
+        if metrics.enabled():
+            metrics.disable()
+            metrics.export(self.metrics_path)
+            self.window.title("Tic-Tac-Toe Deluxe")
+        else:
+            metrics.enable()
+            self.window.title("Tic-Tac-Toe Deluxe [metrics on]")
+    
     def get_easy_move(self):
-        # Just make a random move
-        empty_cells = []
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    empty_cells.append((i, j))
-        
-        if empty_cells:
-            return random.choice(empty_cells)
-        return None
+        from ai import get_easy_move
+        return get_easy_move(self.game)
     
     def get_smart_move(self):
-        # Try to win
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    self.board[i][j] = "O"
-                    if self.check_winner("O"):
-                        self.board[i][j] = " "
-                        return (i, j)
-                    self.board[i][j] = " "
-        
-        # Block player's win
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    self.board[i][j] = "X"
-                    if self.check_winner("X"):
-                        self.board[i][j] = " "
-                        return (i, j)
-                    self.board[i][j] = " "
-        
-        # Try to take center
-        if self.board[1][1] == " ":
-            return (1, 1)
-        
-        # Take corners
-        corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
-        empty_corners = [corner for corner in corners if self.board[corner[0]][corner[1]] == " "]
-        if empty_corners:
-            return random.choice(empty_corners)
-        
-        # Take edges
-        edges = [(0, 1), (1, 0), (1, 2), (2, 1)]
-        empty_edges = [edge for edge in edges if self.board[edge[0]][edge[1]] == " "]
-        if empty_edges:
-            return random.choice(empty_edges)
-        
-        return None
+        from ai import get_smart_move
+        return get_smart_move(self.game)
     
     def check_winner(self, player):
-        # Check rows
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] == player:
-                return True
-        
-        # Check columns
-        for i in range(3):
-            if self.board[0][i] == self.board[1][i] == self.board[2][i] == player:
-                return True
-        
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] == player:
-            return True
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] == player:
-            return True
-        
-        return False
+        return self.game.check_winner(player)
     
     def is_board_full(self):
-        for row in self.board:
-            if " " in row:
-                return False
-        return True
+        return self.game.is_board_full()
     
     def end_game(self, message):
+        from replay import encode_game
+        
         self.game_active = False
         self.turn_indicator.config(text=message, fg="#F39C12")
+        self.last_replay = encode_game(self.game)
+        self.last_replay_names = dict(self.player_names)
         
         # Highlight winning cells
-        if "wins" in message:
-            winner = "X" if "X" in message else "O"
-            self.highlight_winning_cells(winner)
-            
-        # Create play again button
-        play_again_btn = self.create_button(
-            self.window,
-            text="Play Again",
-            font=self.button_font,
-            bg=self.secondary_color,
-            fg=self.text_color,
-            width=15,
-            height=2,
-            command=self.reset_board
-        )
-        play_again_btn.place(relx=0.5, rely=0.85, anchor=tk.CENTER)
+        if self.game.winner in ("X", "O"):
+            self.highlight_winning_cells(self.game.winner)
+        
+        # Show the play again (and replay) buttons
+        self.board_view["play_again_btn"].place(relx=0.5, rely=0.85, anchor=tk.CENTER)
+        if self.moves_history:
+            self.board_view["replay_btn"].place(relx=0.5, rely=0.94, anchor=tk.CENTER)
     
     def highlight_winning_cells(self, player):
-        # Rows
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] == player:
-                for j in range(3):
-                    self.game_buttons[i][j].config(bg="#F1C40F")  # Yellow
-                return
-        
-        # Columns
-        for i in range(3):
-            if self.board[0][i] == self.board[1][i] == self.board[2][i] == player:
-                for j in range(3):
-                    self.game_buttons[j][i].config(bg="#F1C40F")
-                return
-        
-        # Diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] == player:
-            self.game_buttons[0][0].config(bg="#F1C40F")
-            self.game_buttons[1][1].config(bg="#F1C40F")
-            self.game_buttons[2][2].config(bg="#F1C40F")
-            return
-            
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] == player:
-            self.game_buttons[0][2].config(bg="#F1C40F")
-            self.game_buttons[1][1].config(bg="#F1C40F")
-            self.game_buttons[2][0].config(bg="#F1C40F")
-            return
+        self.board_view["cells"].highlight(self.game.winning_cells(player) or [])
     
     def reset_board(self):
+        # The server owns network games; finishing one goes back to the lobby
+        if self.game_mode == "network":
+            if not self.game_active:
+                self.setup_network_screen()
+            return
+        self.cancel_computer_move()
+        
         # Clear board
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.current_player = "X"
+        self.game.reset()
         self.game_active = True
-        self.moves_history = []
-        
-        # Remove play again button if exists
-        for widget in self.window.winfo_children():
-            if isinstance(widget, tk.Button) and widget.cget("text") == "Play Again":
-                widget.destroy()
-        
-        # Reset buttons
-        for i in range(3):
-            for j in range(3):
-                self.game_buttons[i][j].config(
-                    text="",
-                    bg="#34495E",
-                    state=tk.NORMAL
-                )
+        self.game_started_at = now_iso()
+        
+        # Hide the end of game buttons
+        self.board_view["play_again_btn"].place_forget()
+        self.board_view["replay_btn"].place_forget()
+        
+        # Clear only the cells the last game used
+        self.board_view["cells"].sync(self.moves_history)
         
         # Reset turn indicator
-        self.turn_indicator.config(
-            text=f"Current Turn: {self.player_names[self.current_player]} ({self.current_player})",
-            fg=self.primary_color
-        )
+        self.turn_indicator.config(text=self.turn_text(), fg=self.primary_color)
         
         # If computer goes first
         if self.game_mode == "single" and self.current_player == "O":
-            self.window.after(500, self.computer_move)
+            self.schedule_computer_move()
     
     def undo_move(self):
-        if not self.moves_history:
+        if not self.moves_history or self.game_mode == "network":
             return
-            
+        
         # If playing against computer, need to undo both moves
         if self.game_mode == "single":
             if len(self.moves_history) < 2:
                 return
-                
+            
             # Undo computer's move
-            row, col, player = self.moves_history.pop()
-            self.board[row][col] = " "
-            self.game_buttons[row][col].config(text="", bg="#34495E", state=tk.NORMAL)
+            row, col, player = self.game.undo_move()
+            self.paint_cell(row, col, EMPTY)
         
-        # Undo player's move
-        row, col, player = self.moves_history.pop()
-        self.board[row][col] = " "
-        self.game_buttons[row][col].config(text="", bg="#34495E", state=tk.NORMAL)
+        # Undo player's move (any search for the old position is now stale)
+        self.cancel_computer_move()
+        row, col, player = self.game.undo_move()
+        self.paint_cell(row, col, EMPTY)
         
-        # Reset turn to the player who just undid their move
-        self.current_player = player
+        # Turn goes back to the player who just undid their move
         self.game_active = True
         
         # Update turn indicator
-        self.turn_indicator.config(
-            text=f"Current Turn: {self.player_names[self.current_player]} ({self.current_player})",
-            fg=self.primary_color if self.current_player == "X" else self.secondary_color
-        )
+        self.turn_indicator.config(text=self.turn_text(), fg=self.turn_color())
+        
+        # Undoing while the CPU was thinking hands the turn straight back to it
+        if self.game_mode == "single" and self.current_player == "O":
+            self.schedule_computer_move()
     
     def confirm_exit_game(self):
         if messagebox.askyesno("Exit Game", "Are you sure you want to return to the main menu?"):
+            self.cancel_computer_move()
+            self.close_network()
+            self.game_active = False
             self.show_main_menu()
     
     def show_statistics(self):
-        # Load stats from file
-        try:
-            with open(self.stats_file, "r") as f:
-                stats = json.load(f)
-        except:
-            stats = {"games_played": 0, "player_wins": 0, "cpu_wins": 0, "ties": 0}
-        
-        # Clear window
-        for widget in self.window.winfo_children():
-            widget.destroy()
-            
+        self.show_screen("statistics", self.build_statistics)
+        self.refresh_statistics()
+    
+    def build_statistics(self, screen):
         header = self.create_label(
-            self.window, 
+            screen,
             text="GAME STATISTICS",
             font=("Helvetica", 20, "bold"),
             bg=self.bg_color,
@@ -767,30 +1133,36 @@ class TicTacToe:
         )
         header.pack(fill=tk.X)
         
-        stats_frame = tk.Frame(self.window, bg=self.bg_color, pady=20)
+        # Filters; changing one refreshes the figures below
+        filter_frame = tk.Frame(screen, bg=self.bg_color)
+        filter_frame.pack()
+        player_var = tk.StringVar(value="All")
+        difficulty_var = tk.StringVar(value="All")
+        period_var = tk.StringVar(value="All time")
+        menus = []
+        for var, choices in (
+            (player_var, ["All"]),
+            (difficulty_var, ["All", "Easy", "Medium", "Hard", "Expert"]),
+            (period_var, ["All time", "Today", "Last 7 days", "Last 30 days"]),
+        ):
+            menu = tk.OptionMenu(filter_frame, var, *choices, command=lambda *_: self.refresh_statistics())
+            menu.config(font=self.button_font, width=10)
+            menu.pack(side=tk.LEFT, padx=3)
+            menus.append(menu)
+        
+        stats_frame = tk.Frame(screen, bg=self.bg_color, pady=10)
         stats_frame.pack()
         
-        # Display stats
-        stats_text = f"""
-        Games Played: {stats['games_played']}
-        
-        Player Wins: {stats['player_wins']} ({self.percentage(stats['player_wins'], stats['games_played'])}%)
-        
-        CPU Wins: {stats['cpu_wins']} ({self.percentage(stats['cpu_wins'], stats['games_played'])}%)
-        
-        Ties: {stats['ties']} ({self.percentage(stats['ties'], stats['games_played'])}%)
-        """
-        
         stats_label = self.create_label(
             stats_frame,
-            text=stats_text,
+            text="",
             font=self.button_font,
             bg=self.bg_color,
             fg=self.text_color,
             justify=tk.LEFT,
             pady=10
         )
-        stats_label.pack(pady=20)
+        stats_label.pack(pady=5)
         
         # Current session stats
         session_label = self.create_label(
@@ -803,17 +1175,9 @@ class TicTacToe:
         )
         session_label.pack()
         
-        session_text = f"""
-        Player X ({self.player_names['X']}): {self.player_score['X']} wins
-        
-        Player O ({self.player_names['O']}): {self.player_score['O']} wins
-        
-        Ties: {self.player_score['Ties']}
-        """
-        
         session_stats = self.create_label(
             stats_frame,
-            text=session_text,
+            text="",
             font=self.button_font,
             bg=self.bg_color,
             fg=self.text_color,
@@ -822,45 +1186,358 @@ class TicTacToe:
         )
         session_stats.pack(pady=10)
         
-        # Back button
+        # Back and replay buttons
+        nav_frame = tk.Frame(stats_frame, bg=self.bg_color)
+        nav_frame.pack(pady=10)
+        
+        replays_btn = self.create_button(
+            nav_frame,
+            text="Replays",
+            font=self.button_font,
+            bg=self.secondary_color,
+            fg=self.text_color,
+            width=12,
+            height=2,
+            command=self.show_replay_list
+        )
+        replays_btn.pack(side=tk.LEFT, padx=5)
+        
         back_btn = self.create_button(
-            stats_frame,
+            nav_frame,
             text="Back to Menu",
             font=self.button_font,
             bg=self.primary_color,
             fg=self.text_color,
-            width=20,
+            width=12,
             height=2,
             command=self.show_main_menu
         )
-        back_btn.pack(pady=20)
+        back_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.stats_widgets = {
+            "player_var": player_var,
+            "difficulty_var": difficulty_var,
+            "period_var": period_var,
+            "player_menu": menus[0],
+            "stats_label": stats_label,
+            "session_stats": session_stats,
+        }
+    
+    def refresh_statistics(self):
+        from datetime import datetime, timedelta
+        
+        widgets = self.stats_widgets
+        player = widgets["player_var"].get()
+        difficulty = widgets["difficulty_var"].get()
+        period = widgets["period_var"].get()
+        since = {
+            "Today": datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+            "Last 7 days": datetime.now() - timedelta(days=7),
+            "Last 30 days": datetime.now() - timedelta(days=30),
+        }.get(period)
+        filters = {
+            "difficulty": None if difficulty == "All" else difficulty,
+            "mode": None if difficulty == "All" else "single",
+            "since": since.isoformat(timespec="seconds") if since else None,
+        }
+        
+        # New players may have appeared since the menu was filled
+        player_menu = widgets["player_menu"]["menu"]
+        player_menu.delete(0, tk.END)
+        for name in ["All"] + self.stats.player_names():
+            player_menu.add_command(
+                label=name,
+                command=lambda value=name: (widgets["player_var"].set(value), self.refresh_statistics())
+            )
+        
+        # Display stats
+        if player == "All":
+            stats = self.stats.counters(**filters)
+            stats_text = f"""
+        Games Played: {stats['games_played']}
+        
+        Player Wins: {stats['player_wins']} ({self.percentage(stats['player_wins'], stats['games_played'])}%)
+        
+        CPU Wins: {stats['cpu_wins']} ({self.percentage(stats['cpu_wins'], stats['games_played'])}%)
+        
+        Ties: {stats['ties']} ({self.percentage(stats['ties'], stats['games_played'])}%)
+        """
+        else:
+            wins, losses, ties = self.stats.player_record(player, **filters)
+            played = wins + losses + ties
+            rating, rated_games = self.stats.rating(player)
+            stats_text = f"""
+        Rating: {rating:.0f} ({rated_games} rated games)
+        
+        Games Played: {played}
+        
+        Wins: {wins} ({self.percentage(wins, played)}%)
+        
+        Losses: {losses} ({self.percentage(losses, played)}%)
+        
+        Ties: {ties} ({self.percentage(ties, played)}%)
+        """
+        widgets["stats_label"].config(text=stats_text)
+        
+        session_text = f"""
+        Player X ({self.player_names['X']}): {self.player_score['X']} wins
+        
+        Player O ({self.player_names['O']}): {self.player_score['O']} wins
+        
+        Ties: {self.player_score['Ties']}
+        """
+        widgets["session_stats"].config(text=session_text)
+    
+    def show_replay_list(self):
+        self.show_screen("replay_list", self.build_replay_list)
+        
+        self.replay_games = self.stats.recent_games()
+        game_list = self.replay_list
+        game_list.delete(0, tk.END)
+        for game_id, ended_at, player_x, player_o, result in self.replay_games:
+            outcome = "tie" if result == "tie" else f"{result} won"
+            game_list.insert(tk.END, f"{ended_at[:16].replace('T', ' ')}  {player_x} vs {player_o} ({outcome})")
+    
+    def build_replay_list(self, screen):
+        header = self.create_label(
+            screen,
+            text="REPLAYS",
+            font=("Helvetica", 20, "bold"),
+            bg=self.bg_color,
+            fg=self.text_color,
+            pady=20
+        )
+        header.pack(fill=tk.X)
+        
+        game_list = tk.Listbox(screen, font=self.button_font, width=45, height=15)
+        game_list.pack(pady=10)
+        
+        def watch(*_):
+            selection = game_list.curselection()
+            if selection:
+                game_id, _, player_x, player_o, _ = self.replay_games[selection[0]]
+                self.show_replay(self.stats.replay_record(game_id), {"X": player_x, "O": player_o},
+                                 self.show_replay_list)
+        game_list.bind("<Double-Button-1>", watch)
+        
+        nav_frame = tk.Frame(screen, bg=self.bg_color)
+        nav_frame.pack(pady=10)
+        
+        watch_btn = self.create_button(
+            nav_frame,
+            text="Watch",
+            font=self.button_font,
+            bg=self.secondary_color,
+            fg=self.text_color,
+            width=12,
+            command=watch
+        )
+        watch_btn.pack(side=tk.LEFT, padx=5)
+        
+        back_btn = self.create_button(
+            nav_frame,
+            text="Back",
+            font=self.button_font,
+            bg=self.primary_color,
+            fg=self.text_color,
+            width=12,
+            command=self.show_statistics
+        )
+        back_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.replay_list = game_list
+    
+    def show_replay(self, record, names, back):
+        from replay import Replay
+        
+        try:
+            self.replay = Replay(record)
+        except ValueError:
+            messagebox.showerror("Replay", "This game record is damaged")
+            return
+        self.cancel_computer_move()
+        self.game_mode = "replay"
+        self.game_active = False
+        self.game = self.replay.state
+        self.board_size, self.win_length = self.game.size, self.game.win_length
+        self.replay_back = back
+        
+        self.show_screen(("replay", self.board_size), self.build_replay)
+        view = self.replay_screens[self.board_size]
+        self.replay_view = view
+        view["header"].config(text=f"{names['X']} (X) vs {names['O']} (O)")
+        self.turn_indicator = view["turn_indicator"]
+        view["slider"].config(to=len(self.replay))
+        view["cells"].sync(self.moves_history)
+        self.replay_seek(0)
+    
+    def build_replay(self, screen):
+        header = self.create_label(
+            screen,
+            text="",
+            font=self.header_font,
+            bg=self.bg_color,
+            fg=self.text_color,
+            pady=10
+        )
+        header.pack(fill=tk.X)
+        
+        turn_indicator = self.create_label(
+            screen,
+            text="",
+            font=self.button_font,
+            bg=self.bg_color,
+            fg="#F39C12",
+            pady=5
+        )
+        turn_indicator.pack()
+        
+        cells = make_board(screen, self.board_size, lambda row, col: None, self.board_colors)
+        cells.frame.pack()
+        
+        # Dragging the slider seeks; the board is stepped, never rebuilt
+        slider = tk.Scale(
+            screen,
+            from_=0,
+            to=0,
+            orient=tk.HORIZONTAL,
+            length=300,
+            showvalue=False,
+            bg=self.bg_color,
+            highlightthickness=0,
+            command=lambda value: self.replay_seek(int(value))
+        )
+        slider.pack()
+        
+        control_frame = tk.Frame(screen, bg=self.bg_color, pady=10)
+        control_frame.pack()
+        buttons = {}
+        for text, command in (
+            ("|<", lambda: self.replay_seek(0)),
+            ("<", lambda: self.replay_seek(self.replay.position - 1)),
+            ("Play", self.toggle_replay),
+            (">", lambda: self.replay_seek(self.replay.position + 1)),
+            (">|", lambda: self.replay_seek(len(self.replay))),
+        ):
+            button = self.create_button(
+                control_frame,
+                text=text,
+                font=self.button_font,
+                bg=self.primary_color,
+                fg=self.text_color,
+                width=5,
+                command=command
+            )
+            button.pack(side=tk.LEFT, padx=3)
+            buttons[text] = button
+        
+        speeds = {"0.5x": 0.5, "1x": 1.0, "2x": 2.0, "4x": 4.0}
+        speed_var = tk.StringVar(value=f"{self.replay_speed:g}x")
+        speed_menu = tk.OptionMenu(control_frame, speed_var, *speeds,
+                                   command=lambda choice: setattr(self, "replay_speed", speeds[choice]))
+        speed_menu.config(font=self.button_font, width=4)
+        speed_menu.pack(side=tk.LEFT, padx=3)
+        
+        back_btn = self.create_button(
+            screen,
+            text="Back",
+            font=self.button_font,
+            bg=self.accent_color,
+            fg=self.text_color,
+            width=15,
+            activebackground="#C0392B",
+            command=self.close_replay
+        )
+        back_btn.pack(pady=10)
+        
+        self.replay_screens[self.board_size] = {
+            "header": header,
+            "turn_indicator": turn_indicator,
+            "cells": cells,
+            "slider": slider,
+            "play_btn": buttons["Play"],
+        }
+    
+    def replay_seek(self, position):
+        cells = self.replay_view["cells"]
+        for row, col, player in self.replay.seek(position):
+            cells.paint(row, col, player)
+        position = self.replay.position
+        slider = self.replay_view["slider"]
+        if slider.get() != position:
+            slider.set(position)
+        result = ""
+        if self.replay.at_end and self.game.winner:
+            if self.game.winner in ("X", "O"):
+                cells.highlight(self.game.winning_cells(self.game.winner) or [])
+            result = " - tie" if self.game.winner == "tie" else f" - {self.game.winner} wins"
+        else:
+            cells.clear_highlight()
+        self.turn_indicator.config(text=f"Move {position} of {len(self.replay)}{result}")
+    
+    def toggle_replay(self):
+        if self.replay_job is not None:
+            self.stop_replay()
+            return
+        if self.replay.at_end:
+            self.replay_seek(0)
+        self.replay_view["play_btn"].config(text="Pause")
+        self.replay_job = self.window.after(0, self.replay_tick)
+    
+    def replay_tick(self):
+        self.replay_seek(self.replay.position + 1)
+        if self.replay.at_end:
+            self.replay_job = None
+            self.replay_view["play_btn"].config(text="Play")
+        else:
+            self.replay_job = self.window.after(int(800 / self.replay_speed), self.replay_tick)
+    
+    def stop_replay(self):
+        if self.replay_job is not None:
+            self.window.after_cancel(self.replay_job)
+            self.replay_job = None
+            self.replay_view["play_btn"].config(text="Play")
+    
+    def close_replay(self):
+        self.stop_replay()
+        self.replay = None
+        self.game = GameState(self.board_size, self.win_length)
+        self.replay_back()
     
     def percentage(self, part, total):
         if total == 0:
             return 0
         return round((part / total) * 100, 1)
     
+    @metrics.timed("ui.update_stats")
     def update_stats(self, winner):
-        try:
-            with open(self.stats_file, "r") as f:
-                stats = json.load(f)
-        except:
-            stats = {"games_played": 0, "player_wins": 0, "cpu_wins": 0, "ties": 0}
-        
-        stats["games_played"] += 1
-        
-        if winner == "tie":
-            stats["ties"] += 1
-        elif winner == "X":
-            stats["player_wins"] += 1
-        elif winner == "O" and self.game_mode == "single":
-            stats["cpu_wins"] += 1
-        elif winner == "O" and self.game_mode == "multi":
-            stats["player_wins"] += 1
-            
-        with open(self.stats_file, "w") as f:
-            json.dump(stats, f)
+        # Spectators watch other people's games; only players record them
+        if self.game_mode == "network" and self.network_seat is None:
+            return
+        from gamelog import make_record
+        self.stats.record(make_record(
+            self.player_names,
+            self.game_mode,
+            self.difficulty,
+            self.board_size,
+            self.win_length,
+            self.moves_history,
+            winner,
+            self.game_started_at
+        ))
+
+def report_first_frame(game):
+    """Startup probe for startup.py: print the time to the first painted frame and exit"""
+    def painted(event):
+        game.window.unbind("<Map>")
+        game.window.update_idletasks()  # flush the pending redraw of the menu
+        print(f"first-frame {time.perf_counter() - _started:.6f}", flush=True)
+        game.window.after_idle(game.window.quit)
+    game.window.bind("<Map>", painted)
 
 if __name__ == "__main__":
     game = TicTacToe()
-    game.window.mainloop()  # Add this line to start the Tkinter event loop
\ No newline at end of file
+    if os.environ.get("TICTACTOE_STARTUP_PROBE"):
+        report_first_frame(game)
+    game.window.mainloop()  # Add this line to start the Tkinter event loop
+    game.shutdown()